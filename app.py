@@ -1,23 +1,38 @@
 # app.py
-import os
 import sys
 import asyncio
 import logging
-from graph import agent_executor
-from llm_module.intent_recognizer import recognize_intent
-
-# ─── Ensure log directory exists ───────────────────────────────────────────────
-os.makedirs("logs", exist_ok=True)
-
-# ─── Setup logging ─────────────────────────────────────────────────────────────
-logging.basicConfig(
-    filename="logs/app.log",
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)-8s %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+from config import settings
+from tracing import setup_logging
+from graph import run_query, stream_query, warm_up
+from circulars.circulars_fetcher import select_circular
+
+# ─── Setup logging (queued; file writes happen off the event loop) ─────────────
+setup_logging("logs/app.log")
 logger = logging.getLogger(__name__)
 
+# ─── Query Runner ──────────────────────────────────────────────────────────────
+async def answer(query: str) -> tuple[dict, bool]:
+    """
+    Run a query, printing LLM tokens as they arrive when streaming is on.
+    Returns the final state and whether anything was printed.
+    """
+    if not settings.STREAM_RESPONSES:
+        return await run_query(query), False
+
+    result, printed = {}, False
+    async for event in stream_query(query):
+        if event["type"] == "token":
+            if not printed:
+                print("\n🤖 Agent: ", end="", flush=True)
+                printed = True
+            print(event["text"], end="", flush=True)
+        else:
+            result = event["state"]
+    if printed:
+        print()
+    return result, printed
+
 # ─── Async Input Loop ──────────────────────────────────────────────────────────
 async def interactive_loop():
     print("🤖 Type your query, or 'exit' to quit.")
@@ -28,16 +43,22 @@ async def interactive_loop():
                 print("👋 Goodbye!")
                 break
 
-            # Optional: detect intent for logs
-            intent = recognize_intent(query)
-            logger.info(f"USER: {query} | INTENT: {intent}")
-
-            # Process query
-            result = await agent_executor.ainvoke({"query": query})
+            # Process query (intent is classified once, inside the graph;
+            # repeated questions are served from the response cache)
+            result, printed = await answer(query)
+            logger.info(f"USER: {query} | INTENT: {result.get('intent', 'unknown')}")
             response = result.get("result", "No response.")
+
+            # Circular requests: pick one of the candidates, then download
+            candidates = result.get("candidates")
+            if candidates:
+                choice = input(f"\n{response}\n> ")
+                response = await select_circular(candidates, choice)
+                printed = False
             logger.info(f"BOT : {response}")
 
-            print(f"\n🤖 Agent: {response}")
+            if not printed:
+                print(f"\n🤖 Agent: {response}")
 
         except KeyboardInterrupt:
             print("\n👋 Exiting...")
@@ -50,6 +71,7 @@ async def interactive_loop():
 # ─── Entrypoint ────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     try:
+        warm_up()
         asyncio.run(interactive_loop())
     except (KeyboardInterrupt, SystemExit):
         print("🛑 Program stopped.")
@@ -0,0 +1,172 @@
+"""
+Answer a list of queries at once (regression sets, FAQ pre-generation,
+response cache warming). Queries are classified in one batch, identical
+questions run once, queries needing retrieval share batched embedding
+calls per intent, and at most BATCH_CONCURRENCY run through the graph at
+a time. One JSON line per query is written as soon as it finishes.
+
+    uv run batch.py queries.txt                        # one query per line
+    uv run batch.py queries.jsonl -o answers.jsonl     # {"query": ...} per line
+    uv run batch.py queries.txt --concurrency 4 --ordered
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+from contextlib import redirect_stdout
+from typing import AsyncIterator, Iterable
+from config import settings
+from tracing import setup_logging
+from clients import get_embeddings
+from data_ingestion.embedding_cache import normalize_text, primed_queries
+from graph import run_query, warm_up
+from llm_module.intent_recognizer import arecognize_intents
+from llm_module.local_intent import classify_local
+from qa_system.fast_path import answer_directly
+
+# Intents whose graph path embeds the query
+EMBEDDING_INTENTS = {"faculty_info", "pdf_request"}
+
+
+def read_queries(path: str) -> list[str]:
+    """
+    Queries from a text file (one per line; blank lines and # comments are
+    skipped) or a .jsonl file of {"query": ...} objects. "-" reads stdin.
+    """
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with f:
+        lines = [line.strip() for line in f]
+    if path.endswith(".jsonl"):
+        return [json.loads(line)["query"] for line in lines if line]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def _needs_embedding(query: str, intent: str) -> bool:
+    if (settings.RESPONSE_CACHE_ENABLED and settings.RESPONSE_CACHE_SEMANTIC
+            and classify_local(query) in settings.RESPONSE_CACHE_SEMANTIC_INTENTS):
+        return True  # the semantic cache lookup embeds it
+    if intent == "faculty_info":
+        return answer_directly(query) is None  # the fast path never embeds
+    return intent in EMBEDDING_INTENTS
+
+
+def _prime(queries: list[str], intents: list[str]) -> dict[str, list[float]]:
+    """
+    One batched embedding call per intent group for the queries that will
+    embed themselves anyway.
+    """
+    groups: dict[str, list[str]] = defaultdict(list)
+    for query, intent in zip(queries, intents):
+        if _needs_embedding(query, intent):
+            groups[intent].append(query)
+
+    vectors = {}
+    for intent, group in groups.items():
+        vectors.update(get_embeddings().prime(group))
+        print(f"🧮 Pre-embedded {len(group)} {intent} queries")
+    return vectors
+
+
+async def run_batch(queries: Iterable[str], concurrency: int | None = None) -> AsyncIterator[dict]:
+    """
+    Yield {"index", "query", "intent", "result", "cached", "wait_ms", "ms"}
+    per input query, in completion order. Repeated queries are answered
+    once and reported for every index, with "duplicate_of" set.
+    """
+    queries = list(queries)
+    concurrency = max(1, concurrency or settings.BATCH_CONCURRENCY)
+
+    # Identical questions (up to whitespace and case) run once
+    indices: dict[str, list[int]] = defaultdict(list)
+    for i, query in enumerate(queries):
+        indices[normalize_text(query).lower()].append(i)
+    unique = [queries[group[0]] for group in indices.values()]
+
+    start = time.perf_counter()
+    intents = await arecognize_intents(unique, max_concurrency=concurrency)
+    classify_ms = (time.perf_counter() - start) * 1000
+    vectors = await asyncio.to_thread(_prime, unique, intents)
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def answer(query: str, intent: str, group: list[int]) -> tuple[list[int], dict, float, float]:
+        queued = time.perf_counter()
+        async with slots:
+            began = time.perf_counter()
+            try:
+                state = await run_query(query, intent=intent)
+            except Exception as e:
+                state = {"query": query, "intent": intent, "error": f"{type(e).__name__}: {e}"}
+            return group, state, (began - queued) * 1000, (time.perf_counter() - began) * 1000
+
+    # Tasks copy the context here, so every one of them sees the primed vectors
+    with primed_queries(vectors):
+        tasks = [
+            asyncio.create_task(answer(query, intent, group))
+            for query, intent, group in zip(unique, intents, indices.values())
+        ]
+
+    print(f"🧭 Classified {len(unique)} unique queries in {classify_ms:.0f}ms; "
+          f"running {concurrency} at a time")
+    try:
+        for done in asyncio.as_completed(tasks):
+            group, state, wait_ms, ms = await done
+            row = {
+                "query": state.get("query"),
+                "intent": state.get("intent"),
+                "result": state.get("result", ""),
+                "cached": bool(state.get("cached")),
+                "wait_ms": round(wait_ms, 2),
+                "ms": round(ms, 2),
+            }
+            for key in ("candidates", "error"):
+                if state.get(key):
+                    row[key] = state[key]
+            for i in group:
+                yield {"index": i, **row, "query": queries[i],
+                       **({"duplicate_of": group[0]} if i != group[0] else {})}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def write_results(queries: list[str], out, concurrency: int | None, ordered: bool) -> None:
+    start = time.perf_counter()
+    rows = []
+    async for row in run_batch(queries, concurrency):
+        if ordered:
+            rows.append(row)
+            continue
+        out.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        out.flush()
+    for row in sorted(rows, key=lambda r: r["index"]):
+        out.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+    elapsed = time.perf_counter() - start
+    rate = len(queries) / elapsed if elapsed > 0 else float("inf")
+    print(f"✅ Answered {len(queries)} queries in {elapsed:.2f}s ({rate:.1f} queries/sec)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="queries file (.txt or .jsonl), or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL results file (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_CONCURRENCY)
+    parser.add_argument("--ordered", action="store_true", help="write results in input order at the end")
+    args = parser.parse_args()
+
+    setup_logging("logs/app.log")
+    queries = read_queries(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    # Progress messages go to stderr, so stdout carries only the JSONL
+    with redirect_stdout(sys.stderr):
+        warm_up()
+        asyncio.run(write_results(queries, out, args.concurrency, args.ordered))
+    if out is not sys.stdout:
+        out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Recall vs latency of ANN index settings against brute-force ground truth.
+A scratch copy of the table (or synthetic unit vectors) is indexed with
+each index type, then every nprobes x refine_factor combination is timed
+on the same queries; recall@k is measured against exact search.
+
+    uv run -m benchmarks.ann_recall                              # faculty_rag
+    uv run -m benchmarks.ann_recall --table circular_chunks --nprobes 5,10,20,50
+    uv run -m benchmarks.ann_recall --synthetic 100000 --dim 768 --kinds ivf_pq,ivf_hnsw_sq
+"""
+import argparse
+import statistics
+import tempfile
+import time
+import numpy as np
+import pyarrow as pa
+import lancedb
+from config import settings
+from benchmarks.intent_benchmark import percentile
+from data_ingestion.index_manager import INDEX_TYPES, index_params, plan_index, tune_search
+from data_ingestion.lance_tables import ID_KEY, VECTOR_KEY
+
+
+def _ints(text: str) -> list[int]:
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def load_vectors(args) -> np.ndarray:
+    if args.synthetic:
+        rng = np.random.default_rng(args.seed)
+        vectors = rng.standard_normal((args.synthetic, args.dim), dtype=np.float32)
+    else:
+        table = lancedb.connect(settings.LANCEDB_PATH).open_table(args.table)
+        column = table.to_arrow().column(VECTOR_KEY).combine_chunks()
+        vectors = column.values.to_numpy(zero_copy_only=False).reshape(len(column), -1)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, n: int, noise: float, seed: int) -> np.ndarray:
+    """
+    Perturbed copies of random rows, so queries resemble real ones without
+    being exact duplicates of an indexed vector.
+    """
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.choice(len(vectors), size=min(n, len(vectors)), replace=False)]
+    queries = picked + rng.standard_normal(picked.shape, dtype=np.float32) * noise
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def run_queries(table, queries: np.ndarray, k: int, **tuning) -> tuple[list[set], list[float]]:
+    results, latencies = [], []
+    for q in queries:
+        search = table.search(q.tolist(), vector_column_name=VECTOR_KEY).metric("cosine")
+        search = search.select([ID_KEY]).limit(k)
+        if tuning.get("exact"):
+            search = search.bypass_vector_index()
+        else:
+            search = tune_search(search, tuning["nprobes"], tuning["refine_factor"], 0)
+        start = time.perf_counter()
+        rows = search.to_list()
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append({r[ID_KEY] for r in rows})
+    return results, latencies
+
+
+def report(label: str, results: list[set], truth: list[set], latencies: list[float], k: int) -> None:
+    recall = statistics.fmean(len(r & t) / k for r, t in zip(results, truth))
+    print(f"{label:<34} recall@{k}={recall:.3f} mean={statistics.fmean(latencies):.2f}ms "
+          f"p50={percentile(latencies, 50):.2f}ms p95={percentile(latencies, 95):.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", default=settings.RAG_TABLE)
+    parser.add_argument("--synthetic", type=int, default=0, help="use N random vectors instead of a table")
+    parser.add_argument("--dim", type=int, default=768, help="dimension of synthetic vectors")
+    parser.add_argument("--kinds", default="ivf_pq,ivf_hnsw_sq")
+    parser.add_argument("--nprobes", default="5,10,20,50")
+    parser.add_argument("--refine", default="0,5,10")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    n, dim = vectors.shape
+    queries = make_queries(vectors, args.queries, args.noise, args.seed)
+    plan = plan_index(n, dim)
+    print(f"📊 {n} vectors x {dim} dims, {len(queries)} queries, "
+          f"planned index: {plan.kind} {plan.params}")
+
+    data = pa.table({
+        ID_KEY: [str(i) for i in range(n)],
+        VECTOR_KEY: pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), dim),
+    })
+    with tempfile.TemporaryDirectory() as scratch:
+        db = lancedb.connect(scratch)
+        table = db.create_table("bench", data=data)
+        truth, latencies = run_queries(table, queries, args.k, exact=True)
+        report("flat (exact)", truth, truth, latencies, args.k)
+
+        for kind in args.kinds.split(","):
+            params = index_params(kind, n, dim)
+            start = time.perf_counter()
+            table.create_index(metric="cosine", vector_column_name=VECTOR_KEY,
+                               index_type=INDEX_TYPES[kind], replace=True, **params)
+            print(f"🧠 {kind} {params} built in {time.perf_counter() - start:.1f}s")
+
+            for nprobes in _ints(args.nprobes):
+                for refine in _ints(args.refine):
+                    results, latencies = run_queries(table, queries, args.k,
+                                                     nprobes=nprobes, refine_factor=refine)
+                    report(f"{kind} nprobes={nprobes} refine={refine}", results, truth, latencies, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Deterministic stand-ins for the Gemini chat and embedding models, behind
+the same LangChain interfaces, for offline benchmarks.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from typing import Any, AsyncIterator, Iterator
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+import clients
+from llm_module.local_intent import classify_local
+from qa_system.context_builder import count_tokens
+
+WORD_RE = re.compile(r"\w+")
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Bag-of-words hashing embeddings: every token maps to a fixed random
+    direction, so texts sharing words are close, and the same text always
+    gets the same vector. `latency` seconds are slept per call to stand in
+    for the API round trip.
+    """
+
+    def __init__(self, dim: int = 768, latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+        self.calls = 0
+        self._tokens: dict[str, np.ndarray] = {}
+
+    def _token_vector(self, token: str) -> np.ndarray:
+        vec = self._tokens.get(token)
+        if vec is None:
+            seed = int.from_bytes(hashlib.sha256(token.encode("utf-8")).digest()[:8], "big")
+            vec = self._tokens[token] = np.random.default_rng(seed).standard_normal(self.dim)
+        return vec
+
+    def _embed(self, text: str) -> list[float]:
+        tokens = WORD_RE.findall(text.lower()) or [text]
+        vec = np.sum([self._token_vector(t) for t in tokens], axis=0)
+        return (vec / (np.linalg.norm(vec) or 1.0)).astype(np.float32).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model with canned, deterministic replies: intent prompts get the
+    rule-based intent (or "unknown"), everything else a short answer that
+    echoes the end of the prompt. Streams word by word. Reports estimated
+    token usage, so traces show prompt sizes as with Gemini.
+    """
+
+    latency: float = 0.0
+    reply_words: int = 40
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _reply(self, messages: list[BaseMessage]) -> str:
+        prompt = str(messages[-1].content) if messages else ""
+        if "Classify the user's request" in prompt:
+            query = prompt.split("User query:", 1)[-1].strip().split("\n", 1)[0]
+            return classify_local(query) or "unknown"
+        words = prompt.split()[-self.reply_words:]
+        return f"Answer from {len(prompt)} prompt characters: " + " ".join(words)
+
+    @staticmethod
+    def _usage(messages: list[BaseMessage], reply: str) -> dict:
+        prompt = sum(count_tokens(str(m.content)) for m in messages)
+        completion = count_tokens(reply)
+        return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+    def _result(self, messages: list[BaseMessage]) -> ChatResult:
+        reply = self._reply(messages)
+        message = AIMessage(content=reply, usage_metadata=self._usage(messages, reply))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None,
+                  **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _agenerate(self, messages: list[BaseMessage], stop=None, run_manager=None,
+                         **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+    def _stream(self, messages: list[BaseMessage], stop=None, run_manager=None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        for word in self._reply(messages).split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: list[BaseMessage], stop=None, run_manager=None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for word in self._reply(messages).split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def install(dim: int = 768, chat_latency: float = 0.0, embed_latency: float = 0.0) -> None:
+    """
+    Route every client from clients.py to the fakes (one shared embedding
+    model, so its call counter covers the whole run).
+    """
+    embeddings = FakeEmbeddings(dim=dim, latency=embed_latency)
+    clients.use_factories(
+        chat=lambda model, temperature: FakeChatModel(latency=chat_latency),
+        embeddings=lambda model: embeddings,
+    )
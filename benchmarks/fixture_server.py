@@ -0,0 +1,160 @@
+"""
+Local stand-in for the college website: synthetic faculty pages in the
+site's markup (spread over DEPARTMENTS x PAGE_SUFFIXES), a circulars table
+with ETag support, and a small PDF per circular. Everything is generated
+deterministically from the requested sizes.
+
+    uv run -m benchmarks.fixture_server --faculty 1000 --circulars 500 --port 8765
+"""
+import argparse
+import math
+import zlib
+from aiohttp import web
+from config import settings
+
+FIRST_NAMES = ["Anil", "Bharath", "Chaitra", "Deepa", "Girish", "Kavya", "Mahesh", "Nandini",
+               "Prakash", "Rekha", "Suresh", "Usha", "Vinay", "Yashodha"]
+LAST_NAMES = ["Gowda", "Rao", "Shetty", "Kumar", "Hegde", "Murthy", "Naik", "Prasad"]
+DESIGNATIONS = ["Professor & HOD", "Professor", "Associate Professor", "Assistant Professor"]
+QUALIFICATIONS = ["Ph.D", "M.Tech", "M.E, Ph.D", "M.Tech, (Ph.D)"]
+SUBJECTS = ["exam timetable", "fee payment", "holiday notice", "makeup exam", "internship drive",
+            "hostel admission", "scholarship", "workshop", "seminar", "sports meet"]
+SEMESTERS = ["1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th"]
+SYLLABLES = ["ka", "ri", "so", "mu", "de", "la", "ne", "ti", "po", "ve"]
+
+
+def _pick(options: list[str], i: int, salt: int = 0) -> str:
+    return options[zlib.crc32(f"{i}:{salt}".encode()) % len(options)]
+
+
+def faculty_name(i: int) -> tuple[str, str, str]:
+    """
+    (first, middle, last); the middle name spells out `i`, so every name
+    is unique and name lookups hit exactly one person.
+    """
+    middle = "Ra" + "".join(SYLLABLES[int(d)] for d in str(i))
+    return _pick(FIRST_NAMES, i, 1), middle, _pick(LAST_NAMES, i, 2)
+
+
+def faculty_card(i: int) -> str:
+    first, middle, last = faculty_name(i)
+    designation = DESIGNATIONS[0] if i < len(settings.DEPARTMENTS) else _pick(DESIGNATIONS[1:], i, 3)
+    return f"""
+<div class="upcoming-events media maxwidth400 bg-light mb-20">
+  <img src="/images/faculty/{i}.jpg">
+  <h4 class="name">Dr. {first} {middle} {last}</h4>
+  <h5 class="occupation">{designation}</h5>
+  <h5 class="qualification">{_pick(QUALIFICATIONS, i, 4)}</h5>
+  <h5 class="additional">
+    <span><i class="fa fa-phone"></i> 9{i:09d}</span>
+    <span><i class="fa fa-envelope-o"></i> {first.lower()}.{middle.lower()}@mcehassan.ac.in</span>
+  </h5>
+</div>"""
+
+
+def circular_title(i: int) -> str:
+    return f"{_pick(SEMESTERS, i, 5)} sem {_pick(SUBJECTS, i, 6)} circular no. {i}"
+
+
+def circular_pdf(i: int, pages: int = 2) -> bytes:
+    """
+    A minimal valid PDF with one line of text per page.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * p} 0 R" for p in range(pages))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>")
+    font = 3 + 2 * pages
+    for p in range(pages):
+        text = f"{circular_title(i)} page {p + 1}: students are informed to follow the schedule."
+        stream = f"BT /F1 11 Tf 40 760 Td ({text}) Tj ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * p} 0 R >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for n, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def create_app(num_faculty: int, num_circulars: int) -> web.Application:
+    departments = settings.DEPARTMENTS
+    suffixes = [s.strip("/") for s in settings.PAGE_SUFFIXES]
+    per_dept = math.ceil(num_faculty / len(departments))
+    per_page = max(1, math.ceil(per_dept / len(suffixes)))
+    etag = f'"circulars-{num_circulars}"'
+
+    async def faculty_page(request: web.Request) -> web.Response:
+        dept = request.match_info["dept"]
+        page = request.match_info.get("page", "")
+        if dept not in departments or page not in suffixes:
+            raise web.HTTPNotFound()
+        d, p = departments.index(dept), suffixes.index(page)
+        # Faculty i belongs to department i % len(departments)
+        ids = [j * len(departments) + d for j in range(p * per_page, (p + 1) * per_page)]
+        cards = "".join(faculty_card(i) for i in ids if i < num_faculty)
+        return web.Response(text=f"<html><body>{cards}</body></html>", content_type="text/html")
+
+    async def circulars_page(request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        rows = "".join(
+            f'<tr><td>{i + 1}</td><td>{circular_title(i)}</td>'
+            f'<td><a href="/uploads/circulars/{i}.pdf">Download</a></td></tr>'
+            for i in reversed(range(num_circulars))
+        )
+        html = f'<html><body><table class="table-hover"><tbody>{rows}</tbody></table></body></html>'
+        return web.Response(text=html, content_type="text/html", headers={"ETag": etag})
+
+    async def pdf(request: web.Request) -> web.Response:
+        i = int(request.match_info["i"])
+        if i >= num_circulars:
+            raise web.HTTPNotFound()
+        return web.Response(body=circular_pdf(i), content_type="application/pdf")
+
+    app = web.Application()
+    app.router.add_get("/home/Faculty/{dept}", faculty_page)
+    app.router.add_get("/home/Faculty/{dept}/{page}", faculty_page)
+    app.router.add_get("/home/Circulars", circulars_page)
+    app.router.add_get(r"/uploads/circulars/{i:\d+}.pdf", pdf)
+    return app
+
+
+async def start(num_faculty: int, num_circulars: int, port: int = 0) -> tuple[web.AppRunner, str]:
+    """
+    Serve the fixtures on 127.0.0.1 (a free port when 0). Returns the runner
+    (call .cleanup() to stop) and the base URL.
+    """
+    runner = web.AppRunner(create_app(num_faculty, num_circulars))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def point_settings_at(base_url: str) -> None:
+    """
+    Make the scraper and circulars fetcher crawl the fixture server.
+    """
+    settings.FACULTY_BASE_URL = f"{base_url}/home/Faculty"
+    settings.CIRCULARS_URL = f"{base_url}/home/Circulars"
+    settings.CRAWL_MODE = "http"
+    settings.CRAWL_HOST_DELAY = 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faculty", type=int, default=1000)
+    parser.add_argument("--circulars", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    print(f"🧪 Fixture site on http://127.0.0.1:{args.port} "
+          f"({args.faculty} faculty, {args.circulars} circulars)")
+    web.run_app(create_app(args.faculty, args.circulars), host="127.0.0.1", port=args.port)
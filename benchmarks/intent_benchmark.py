@@ -0,0 +1,74 @@
+"""
+Accuracy and latency of the intent classifier tiers on the labelled set.
+
+    uv run -m benchmarks.intent_benchmark          # local rules only
+    uv run -m benchmarks.intent_benchmark --llm    # also the Gemini chain and the tiered classifier
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from llm_module.local_intent import classify_local
+from llm_module.intent_recognizer import _parse_intent, get_chain, recognize_intent
+
+EVAL_SET = os.path.join(os.path.dirname(__file__), "data", "intent_eval.jsonl")
+
+
+def load_eval_set(path: str = EVAL_SET) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_tier(name: str, classify, examples: list[dict], repeat: int = 1) -> dict:
+    latencies, correct, answered = [], 0, 0
+    for ex in examples:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pred = classify(ex["query"])
+            latencies.append((time.perf_counter() - start) * 1000)
+        if pred is None:
+            continue
+        answered += 1
+        correct += pred == ex["intent"]
+
+    report = {
+        "tier": name,
+        "coverage": answered / len(examples),
+        "accuracy": correct / answered if answered else 0.0,
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+    }
+    print(f"{name:<8} coverage={report['coverage']:.0%} accuracy={report['accuracy']:.1%} "
+          f"mean={report['mean_ms']:.3f}ms p50={report['p50_ms']:.3f}ms p95={report['p95_ms']:.3f}ms")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", action="store_true", help="also benchmark the Gemini chain (uses API quota)")
+    parser.add_argument("--repeat", type=int, default=100, help="repetitions per query for the local tier")
+    args = parser.parse_args()
+
+    examples = load_eval_set()
+    print(f"📊 {len(examples)} labelled queries")
+    reports = [run_tier("local", classify_local, examples, repeat=args.repeat)]
+    if args.llm:
+        reports.append(run_tier("llm", lambda q: _parse_intent(get_chain().invoke({"text": q})), examples))
+        reports.append(run_tier("tiered", recognize_intent, examples))
+
+    for ex in examples:
+        pred = classify_local(ex["query"])
+        if pred is not None and pred != ex["intent"]:
+            print(f"   ✗ local: {ex['query']!r} -> {pred} (expected {ex['intent']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Offline benchmark suite: ingestion stages and every agent_executor path,
+run against deterministic fake Gemini models and a local fixture copy of
+the college website, at one or more synthetic scales. Each scale runs in
+its own process with a scratch LanceDB and PDF directory, so results and
+memory figures are independent.
+
+    uv run -m benchmarks.offline_suite                                  # 100 and 1000
+    uv run -m benchmarks.offline_suite --scales 100,1000,10000,100000 --json results.jsonl
+    uv run -m benchmarks.offline_suite --embed-latency 0.05 --chat-latency 0.3   # model round trips
+    uv run -m benchmarks.offline_suite --qa-context raw        # compare with the uncompressed context
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# The fakes never call Gemini, but config requires a key, and the import
+# below already loads config
+os.environ.setdefault("GEMINI_API_KEY", "offline")
+
+from benchmarks.intent_benchmark import percentile
+
+PATHS = ["faculty_fast", "faculty_rag", "circular", "identity", "unknown"]
+PATH_INTENTS = {"faculty_fast": "faculty_info", "faculty_rag": "faculty_info",
+                "circular": "pdf_request", "identity": "identity", "unknown": "unknown"}
+IDENTITY_QUERIES = ["who are you", "what can you do", "who created you", "are you a bot"]
+UNKNOWN_QUERIES = ["how is the weather today", "tell me a joke", "what is the cricket score"]
+RAG_TOPICS = ["machine learning", "structural analysis", "power systems", "embedded systems",
+              "thermodynamics", "data mining"]
+DEPT_NAMES = ["CSE", "ISE", "ECE", "EEE", "Civil", "Mechanical"]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+class Recorder:
+    def __init__(self, scale: int, trace_memory: bool):
+        self.scale = scale
+        self.trace_memory = trace_memory
+        self.results: list[dict] = []
+
+    def record(self, kind: str, name: str, items: int, seconds: float,
+               latencies: list[float] | None = None, peak_mb: float | None = None, **extra) -> None:
+        row = {
+            "scale": self.scale, "kind": kind, "name": name, "items": items,
+            "seconds": round(seconds, 4), "throughput": round(items / seconds, 2) if seconds else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+        if peak_mb is not None:
+            row["py_peak_mb"] = round(peak_mb, 1)
+        if latencies:
+            row.update({
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "mean_ms": round(statistics.fmean(latencies), 2),
+            })
+        row.update(extra)
+        self.results.append(row)
+        lat = (f" p50={row['p50_ms']}ms p95={row['p95_ms']}ms p99={row['p99_ms']}ms"
+               if latencies else "")
+        print(f"   {kind:<6} {name:<16} {items:>7} items {seconds:8.2f}s "
+              f"{row['throughput'] or 0:>9.1f}/s{lat} rss={row['peak_rss_mb']}MB")
+
+    async def stage(self, name: str, run, items=None) -> object:
+        """
+        Time one ingestion stage; `items` maps its result to an item count.
+        """
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = await run()
+        seconds = time.perf_counter() - start
+        peak = None
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        self.record("stage", name, items(result) if items else int(result or 0), seconds, peak_mb=peak)
+        return result
+
+
+def make_queries(path: str, n: int, scale: int, rng: random.Random) -> list[str]:
+    from benchmarks.fixture_server import circular_title, faculty_name
+
+    queries = []
+    for _ in range(n):
+        if path == "faculty_fast":
+            queries.append(f"email of Dr. {' '.join(faculty_name(rng.randrange(scale)))}")
+        elif path == "faculty_rag":
+            queries.append(f"Which faculty member in {rng.choice(DEPT_NAMES)} can guide "
+                           f"a {rng.choice(RAG_TOPICS)} project?")
+        elif path == "circular":
+            queries.append(f"{circular_title(rng.randrange(scale))} pdf")
+        elif path == "identity":
+            queries.append(rng.choice(IDENTITY_QUERIES))
+        else:
+            queries.append(rng.choice(UNKNOWN_QUERIES))
+    return queries
+
+
+async def bench_path(rec: Recorder, executor, path: str, queries: list[str], concurrency: int) -> None:
+    import tracing
+
+    # Sequential runs give clean per-query latencies and token counts...
+    latencies, misrouted, prompt_tokens = [], 0, 0
+    start = time.perf_counter()
+    for q in queries:
+        t0 = time.perf_counter()
+        with tracing.request(q) as trace:
+            state = await executor.ainvoke({"query": q}, config={"callbacks": tracing.callbacks()})
+        latencies.append((time.perf_counter() - t0) * 1000)
+        misrouted += state.get("intent") != PATH_INTENTS[path]
+        prompt_tokens += trace.counters["prompt_tokens"] if trace else 0
+    rec.record("path", path, len(queries), time.perf_counter() - start, latencies, misrouted=misrouted,
+               prompt_tokens_per_query=round(prompt_tokens / len(queries), 1))
+
+    # ...and a concurrent pass gives throughput under load
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(q: str) -> None:
+        async with sem:
+            await executor.ainvoke({"query": q})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in queries))
+    rec.record("load", f"{path} x{concurrency}", len(queries), time.perf_counter() - start)
+
+
+async def run_scale(args) -> list[dict]:
+    """
+    One scale, in this process. Settings must already point at scratch
+    directories (see main); modules reading them are imported here.
+    """
+    from benchmarks import fakes, fixture_server
+    from config import settings
+
+    fakes.install(dim=args.dim, chat_latency=args.chat_latency, embed_latency=args.embed_latency)
+    settings.QA_CONTEXT_MODE = args.qa_context
+    runner, base_url = await fixture_server.start(args.scale, args.scale)
+    fixture_server.point_settings_at(base_url)
+    rec = Recorder(args.scale, args.trace_memory)
+    print(f"📊 scale={args.scale} fixtures={base_url} qa_context={args.qa_context}")
+
+    try:
+        from data_ingestion.scraper import crawl_faculty_pages
+        from data_ingestion.loader import build_rag_table, embed_records, stream_into_lancedb
+        from circulars import circulars_fetcher
+
+        async def crawl():
+            return [page async for page in crawl_faculty_pages()]
+
+        pages = await rec.stage("crawl", crawl, items=lambda p: sum(map(len, p)))
+
+        async def replay():
+            for page in pages:
+                yield page
+
+        await rec.stage("ingest", lambda: stream_into_lancedb(replay()))
+        await rec.stage("rag_build", lambda: asyncio.to_thread(build_rag_table))
+        sample = [row for page in pages for row in page][:args.embed_sample]
+        await rec.stage("embed_cached", lambda: asyncio.to_thread(embed_records, sample), items=len)
+        await rec.stage("circulars_sync", lambda: asyncio.to_thread(circulars_fetcher.load_circulars),
+                        items=lambda _: args.scale)
+        if args.content:
+            await rec.stage("content_index", circulars_fetcher._index_contents,
+                            items=lambda _: args.scale)
+
+        from graph import agent_executor, warm_up
+
+        await asyncio.to_thread(warm_up)
+        rng = random.Random(args.seed)
+        for path in PATHS:
+            await bench_path(rec, agent_executor, path,
+                             make_queries(path, args.queries, args.scale, rng), args.concurrency)
+
+        # Mixed queries through the batch API (shared classification/embedding)
+        from batch import run_batch
+
+        mixed = [q for path in PATHS for q in make_queries(path, args.queries, args.scale, rng)]
+        start = time.perf_counter()
+        latencies = [row["ms"] async for row in run_batch(mixed, args.concurrency)]
+        rec.record("load", f"batch x{args.concurrency}", len(mixed), time.perf_counter() - start, latencies)
+    finally:
+        await runner.cleanup()
+    return rec.results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="100,1000", help="faculty/circular counts, comma separated")
+    parser.add_argument("--queries", type=int, default=100, help="queries per agent path")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--chat-latency", type=float, default=0.0, help="seconds per fake chat call")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="seconds per fake embedding call")
+    parser.add_argument("--embed-sample", type=int, default=1000, help="records re-embedded from cache")
+    parser.add_argument("--qa-context", default="compact", choices=["compact", "raw"],
+                        help="faculty RAG context: deduplicated table or raw documents")
+    parser.add_argument("--content", action="store_true", help="also index circular PDFs (needs pypdf)")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc peak per stage (slower)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default="", help="append result rows to this JSONL file")
+    parser.add_argument("--scale", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scale:
+        results = asyncio.run(run_scale(args))
+        print("RESULTS " + json.dumps(results))
+        return
+
+    # Each scale gets a fresh process and scratch storage; settings are
+    # read from the environment at import time.
+    rows = []
+    for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+        with tempfile.TemporaryDirectory() as scratch:
+            env = dict(os.environ,
+                       LANCEDB_PATH=os.path.join(scratch, "lance_db"),
+                       PDF_STORAGE=os.path.join(scratch, "pdfs"),
+                       RESPONSE_CACHE_ENABLED="false")
+            cmd = [sys.executable, "-m", "benchmarks.offline_suite", *sys.argv[1:], "--scale", str(scale)]
+            proc = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, text=True)
+            for line in proc.stdout.splitlines():
+                if line.startswith("RESULTS "):
+                    rows.extend(json.loads(line[len("RESULTS "):]))
+                else:
+                    print(line)
+            if proc.returncode:
+                print(f"❌ scale {scale} failed (exit {proc.returncode})")
+
+    if args.json and rows:
+        with open(args.json, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in rows)
+        print(f"📝 {len(rows)} result rows appended to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,25 @@
 import os
 import time
-import re
 import json
+import asyncio
+import threading
 import requests
 from urllib.parse import urljoin
-from dotenv import load_dotenv
 from bs4 import BeautifulSoup
-import lancedb
+import pyarrow as pa
 
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain_community.vectorstores import LanceDB
 from langchain.schema import Document
+from clients import get_cached_embeddings
+import tracing
 from config import settings
-
-# Load environment variables
-env_path = os.getenv("DOTENV_PATH", ".env")
-load_dotenv(env_path)
+from stores import stores
+from circulars.downloads import download_manager
+from circulars.content_indexer import CHUNKS_TABLE, index_circular_contents, index_downloads
+from data_ingestion.embedding_cache import text_hash
+from data_ingestion.index_manager import ensure_index, tune_search
+from data_ingestion.lance_tables import (
+    ID_KEY, TEXT_KEY, VECTOR_KEY, sql_in, vectorstore_record, vectorstore_schema,
+)
 
 # Configuration
 PDF_DIR = settings.PDF_STORAGE
@@ -23,45 +27,79 @@ DB_PATH = settings.LANCEDB_PATH
 TABLE_NAME = "circulars"
 STATE_FILE = os.path.join(PDF_DIR, "circulars_state.json")
 
-# Ensure storage dirs exist
-os.makedirs(PDF_DIR, exist_ok=True)
-os.makedirs(DB_PATH, exist_ok=True)
+# Refresh coordination: one sync at a time, at most one background refresh
+_sync_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_refresh_thread: threading.Thread | None = None
+_last_checked: float | None = None
 
-# Initialize embedding & LLM clients
-embeddings = GoogleGenerativeAIEmbeddings(
-    model=settings.GEMINI_EMBEDDING_MODEL,
-    google_api_key=os.getenv("GEMINI_API_KEY"),
-)
-llm = ChatGoogleGenerativeAI(
-    model=settings.GEMINI_CHAT_MODEL,
-    temperature=0,
-    google_api_key=os.getenv("GEMINI_API_KEY"),
-)
+def _read_manifest() -> dict:
+    """
+    Per-row manifest of the indexed circulars, {"rows": {url: desc_hash}},
+    plus the page validators (etag, last_modified) and checked_at time.
+    """
+    if os.path.exists(STATE_FILE):
+        try:
+            with open(STATE_FILE, "r") as sf:
+                state = json.load(sf)
+            if isinstance(state.get("rows"), dict):
+                return state
+        except Exception:
+            pass
+    return {"rows": {}}
 
-# Connect to LanceDB
-db = lancedb.connect(DB_PATH)
 
+def _write_manifest(state: dict) -> None:
+    try:
+        os.makedirs(PDF_DIR, exist_ok=True)
+        tmp = f"{STATE_FILE}.tmp"
+        with open(tmp, "w") as sf:
+            json.dump(state, sf, indent=2)
+        os.replace(tmp, STATE_FILE)
+    except Exception as e:
+        print(f"⚠️ Could not write state file: {e}")
 
-def load_circulars() -> None:
+
+def scrape_circulars(state: dict | None = None) -> list[tuple[str, str]] | None:
     """
-    Scrape the circulars table and rebuild the LanceDB index only
-    when a new circular appears in the first row.
+    Fetch the circulars page and return (description, url) pairs,
+    newest first, one per URL. When `state` carries ETag/Last-Modified
+    validators the request is conditional, and None is returned on a
+    304 without parsing anything; fresh validators are written back
+    into `state["pending_validators"]`.
     """
+    headers = {}
+    if state:
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
     try:
-        resp = requests.get(str(settings.CIRCULARS_URL), timeout=15)
+        with tracing.span("http.circulars_page") as attrs:
+            resp = requests.get(str(settings.CIRCULARS_URL), headers=headers, timeout=15)
+            attrs.update(status=resp.status_code, bytes=len(resp.content))
+        if resp.status_code == 304:
+            return None
         resp.raise_for_status()
     except Exception as e:
         print(f"❌ Failed to fetch circulars page: {e}")
-        return
+        return []
+
+    if state is not None:
+        state["pending_validators"] = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        }
 
     soup = BeautifulSoup(resp.text, "html.parser")
     table = soup.find("table", class_="table-hover")
     if not table or not table.tbody:
         print("⚠️ Circular table not found on page.")
-        return
+        return []
 
     # Collect (desc, url)
-    rows = []
+    rows, seen = [], set()
     for tr in table.tbody.find_all("tr"):
         cols = tr.find_all("td")
         if len(cols) != 3:
@@ -71,131 +109,274 @@ def load_circulars() -> None:
         href = a["href"] if a and a.has_attr("href") else None
         if href:
             full_url = urljoin(str(settings.CIRCULARS_URL), href)
-            rows.append((desc, full_url))
+            if full_url not in seen:
+                seen.add(full_url)
+                rows.append((desc, full_url))
+    return rows
 
-    if not rows:
-        print("⚠️ No circulars found.")
-        return
 
-    # Check state
-    prev_first = None
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, "r") as sf:
-                prev_first = json.load(sf).get("first_desc")
-        except Exception:
-            prev_first = None
+def load_circulars() -> None:
+    """
+    Scrape the circulars table and sync the LanceDB index incrementally:
+    rows are keyed by URL and compared by description hash against the
+    state manifest, so only new or edited circulars are embedded and
+    upserted, and removed ones are deleted. The live table is never dropped.
+    """
+    global _last_checked
+
+    with _sync_lock:
+        table = stores.table(TABLE_NAME, DB_PATH, latest=True)
+        state = _read_manifest()
+        # A missing table or a pre-manifest state file means a full (re)build
+        rebuild = table is None or not state["rows"]
+
+        rows = scrape_circulars(None if rebuild else state)
+        validators = state.pop("pending_validators", {})
+        if rows is None:
+            print("ℹ️ Circulars page not modified (304); skipping update.")
+            state["checked_at"] = _last_checked = time.time()
+            _write_manifest(state)
+            return
+        if not rows:
+            print("⚠️ No circulars found.")
+            # Back off until the next TTL window instead of re-fetching per query
+            _last_checked = time.time()
+            return
+
+        indexed = {} if rebuild else state["rows"]
+        current = {url: (desc, text_hash(desc)) for desc, url in rows}
+        upserts = [url for url, (_, h) in current.items() if indexed.get(url) != h]
+        removed = [url for url in indexed if url not in current]
+
+        records = []
+        if upserts or removed:
+            vectors = get_cached_embeddings().embed_many([current[url][0] for url in upserts])
+            records = [
+                vectorstore_record(url, current[url][0], vec, {"url": url})
+                for url, vec in zip(upserts, vectors)
+                if vec is not None
+            ]
+
+            if records:
+                data = pa.Table.from_pylist(
+                    records, schema=vectorstore_schema(len(records[0][VECTOR_KEY]), ["url"])
+                )
+                if rebuild:
+                    # Overwrite commits a new table version atomically; readers
+                    # keep seeing the previous version until it lands.
+                    table = stores.connect(DB_PATH).create_table(TABLE_NAME, data=data, mode="overwrite")
+                else:
+                    (table.merge_insert(ID_KEY)
+                     .when_matched_update_all()
+                     .when_not_matched_insert_all()
+                     .execute(data))
+            elif rebuild:
+                print("❌ All circular embeddings failed.")
+                return
+
+            if removed and not rebuild:
+                table.delete(sql_in(ID_KEY, removed))
+
+            print(f"✅ Circulars synced: {len(records)} upserted, {len(removed)} removed, "
+                  f"{len(upserts) - len(records)} failed.")
+            ensure_index(table, metric="cosine")
+            stores.publish([TABLE_NAME], DB_PATH)
+        else:
+            print("ℹ️ No new circulars detected; skipping update.")
+
+        for rec in records:
+            indexed[rec[ID_KEY]] = current[rec[ID_KEY]][1]
+        for url in removed:
+            indexed.pop(url, None)
+        state["rows"] = indexed
+        # Only trust the page validators once every row made it into the
+        # index; otherwise the next check must re-parse to retry failures.
+        if len(records) == len(upserts):
+            state.update(validators)
+        state["checked_at"] = _last_checked = time.time()
+        _write_manifest(state)
+
+
+async def _index_contents() -> None:
+    try:
+        await index_circular_contents(stores.connect(DB_PATH), get_cached_embeddings(), TABLE_NAME)
+        stores.publish([CHUNKS_TABLE], DB_PATH)
+    finally:
+        await index_downloads.close()
 
-    # If unchanged, skip
-    if prev_first and rows[0][0] == prev_first:
-        print("ℹ️ No new circulars detected; skipping update.")
-        return
 
-    # Build Document list
-    docs = [
-        Document(page_content=desc, metadata={"url": url})
-        for desc, url in rows
-    ]
-
-    # Drop & rebuild index
-    if TABLE_NAME in db.table_names():
-        db.drop_table(TABLE_NAME)
-    LanceDB.from_documents(
-        documents=docs,
-        embedding=embeddings,
-        connection=db,
-        table_name=TABLE_NAME,
-    )
-    print(f"✅ Indexed {len(docs)} circulars.")
+def index_contents() -> None:
+    """
+    Index the PDF content of new or changed circulars (circular_chunks).
+    """
+    if settings.CONTENT_INDEX_ENABLED:
+        asyncio.run(_index_contents())
 
-    # Save new state
-    try:
-        with open(STATE_FILE, "w") as sf:
-            json.dump({"first_desc": rows[0][0]}, sf)
-    except Exception as e:
-        print(f"⚠️ Could not write state file: {e}")
+
+def refresh_circulars() -> None:
+    """
+    Sync the circulars index, then index the content of any new circulars.
+    """
+    load_circulars()
+    index_contents()
 
 
-def find_circulars(query: str, k: int = 5) -> list[Document]:
+def _refresh_in_background(target=refresh_circulars) -> bool:
     """
-    Semantic search on the circulars index.
+    Start `target` in a background thread unless a refresh is already
+    running. It runs as the "circulars" refresh job, so it is skipped
+    while the refresh service runs that job in any process. Returns True
+    when a new refresh was started.
     """
-    if TABLE_NAME not in db.table_names():
-        print("⚠️ Circulars index not found; run load_circulars() first.")
-        return []
+    global _refresh_thread
+    from refresh_service import run_job  # deferred: pulls in the scheduler
 
-    vs = LanceDB(
-        connection=db,
-        table_name=TABLE_NAME,
-        embedding=embeddings,
-    )
-    retriever = vs.as_retriever(search_kwargs={"k": k})
-    return retriever.invoke(query)
+    with _refresh_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return False
+        _refresh_thread = threading.Thread(
+            target=lambda: asyncio.run(run_job("circulars", target)),
+            name="circulars-refresh", daemon=True,
+        )
+        _refresh_thread.start()
+        return True
 
 
-def download_pdf(url: str, title: str) -> str:
+def ensure_fresh_circulars() -> None:
     """
-    Download a PDF if not already saved, using a sanitized, underscore-based filename.
+    Serve from the existing index and refresh it in the background once
+    it is older than CIRCULARS_TTL_SECONDS. Only a missing index blocks
+    the caller on a synchronous load.
     """
-    # Sanitize & truncate title
-    clean = re.sub(r"[^\w\s]", "", title)
-    underscored = "_".join(clean.strip().split())[:50]
-    filename = f"{underscored}.pdf"
-    path = os.path.join(PDF_DIR, filename)
+    global _last_checked
 
-    if os.path.exists(path):
-        return path
+    if stores.table(TABLE_NAME, DB_PATH) is None:
+        from refresh_service import job_lock
 
-    try:
-        resp = requests.get(url, timeout=20)
-        resp.raise_for_status()
-        if "application/pdf" not in resp.headers.get("Content-Type", ""):
-            raise ValueError("URL did not return a PDF")
+        # Wait out a refresh elsewhere that may be creating the index
+        with job_lock("circulars"):
+            if stores.table(TABLE_NAME, DB_PATH) is None:
+                load_circulars()
+        _refresh_in_background(index_contents)
+        return
+
+    if _last_checked is None:
+        _last_checked = _read_manifest().get("checked_at", 0.0)
+    if time.time() - _last_checked >= settings.CIRCULARS_TTL_SECONDS:
+        if _refresh_in_background():
+            print("🔄 Circulars index is stale; refreshing in background.")
 
-        with open(path, "wb") as f:
-            f.write(resp.content)
-        return path
 
+def find_circulars(query: str, k: int = 5) -> list[Document]:
+    """
+    Semantic search over circular descriptions and, when indexed, their
+    PDF content chunks; hits are collapsed to unique circulars ranked by
+    their closest match.
+    """
+    table = stores.table(TABLE_NAME, DB_PATH)
+    if table is None:
+        print("⚠️ Circulars index not found; run load_circulars() first.")
+        return []
+
+    vec = get_cached_embeddings().embed_query(query)
+    best: dict[str, tuple[float, str]] = {}
+
+    def consider(url: str, title: str, distance: float) -> None:
+        if url not in best or distance < best[url][0]:
+            best[url] = (distance, title)
+
+    with tracing.span("search.circulars") as attrs:
+        hits = tune_search(table.search(vec).metric("cosine").limit(k)).to_list()
+        attrs["hits"] = len(hits)
+    for hit in hits:
+        consider(hit["metadata"]["url"], hit[TEXT_KEY], hit["_distance"])
+    chunks = stores.table(CHUNKS_TABLE, DB_PATH)
+    if chunks is not None:
+        fanout = k * settings.CONTENT_SEARCH_FANOUT
+        with tracing.span("search.circular_chunks") as attrs:
+            hits = tune_search(chunks.search(vec).metric("cosine").limit(fanout)).to_list()
+            attrs["hits"] = len(hits)
+        for hit in hits:
+            consider(hit["metadata"]["url"], hit["metadata"]["title"], hit["_distance"])
+
+    ranked = sorted(best.items(), key=lambda kv: kv[1][0])[:k]
+    tracing.count("documents_retrieved", len(ranked))
+    return [Document(page_content=title, metadata={"url": url}) for url, (_, title) in ranked]
+
+
+async def download_pdf(url: str) -> str:
+    """
+    Download a PDF through the shared download manager (pooled, streamed,
+    deduplicated). Returns its path, or "" on failure.
+    """
+    try:
+        with tracing.span("http.pdf_download"):
+            return await download_manager.fetch(url)
     except Exception as e:
         print(f"❌ Download failed: {e}")
         return ""
 
 
-def handle_pdf_scraping(user_query: str) -> str:
+def search_circulars(user_query: str, k: int = 5) -> list[dict]:
     """
-    End-to-end flow for circular requests:
-      1) load_circulars()
-      2) find_circulars()
-      3) interactive selection & download
-    Returns a summary string or error.
+    Candidate circulars for a query, as {"title", "url"} dicts, served
+    from the index (refreshed in the background when stale).
     """
-    load_circulars()
-    docs = find_circulars(user_query, k=5)
-    if not docs:
-        return "❌ No matching circulars found."
+    ensure_fresh_circulars()
+    docs = find_circulars(user_query, k=k)
+    return [{"title": d.page_content, "url": d.metadata["url"]} for d in docs]
 
-    # Show options
-    menu = "\n".join(f"{i+1}. {d.page_content}" for i, d in enumerate(docs))
-    prompt = (
+
+def format_candidates(user_query: str, candidates: list[dict]) -> str:
+    menu = "\n".join(f"{i+1}. {c['title']}" for i, c in enumerate(candidates))
+    return (
         f"I found these circulars for \"{user_query}\":\n{menu}\n"
         "Please pick a number (or type 'skip')."
     )
-    # Use LLM to ask user which one? Here we fallback to raw input
-    choice = input(f"\n{prompt}\n> ").strip()
+
+
+async def select_circular(candidates: list[dict], choice: str) -> str:
+    """
+    Second step of a circular request: download the chosen candidate
+    (1-based `choice`, or 'skip'). Returns a summary string or error.
+    """
+    choice = choice.strip()
     if choice.lower() == "skip":
         return "Skipped download."
 
-    if not choice.isdigit() or not (1 <= int(choice) <= len(docs)):
+    if not choice.isdigit() or not (1 <= int(choice) <= len(candidates)):
         return "❌ Invalid selection."
 
-    selected = docs[int(choice) - 1]
-    path = download_pdf(selected.metadata["url"], selected.page_content)
+    selected = candidates[int(choice) - 1]
+    path = await download_pdf(selected["url"])
     if path:
-        return f"✅ Downloaded and saved to {path}"
+        return f"✅ Downloaded \"{selected['title']}\" and saved to {path}"
     else:
         return "❌ Download failed."
 
 
+def handle_pdf_scraping(user_query: str) -> str:
+    """
+    Interactive end-to-end flow for circular requests on the terminal:
+      1) search_circulars()
+      2) selection on stdin & select_circular()
+    Returns a summary string or error.
+    """
+    candidates = search_circulars(user_query, k=5)
+    if not candidates:
+        return "❌ No matching circulars found."
+
+    choice = input(f"\n{format_candidates(user_query, candidates)}\n> ")
+    return asyncio.run(_select_once(candidates, choice))
+
+
+async def _select_once(candidates: list[dict], choice: str) -> str:
+    try:
+        return await select_circular(candidates, choice)
+    finally:
+        await download_manager.close()
+
+
 if __name__ == "__main__":
     while True:
         q = input("\nEnter circular query (or 'exit'): ").strip()
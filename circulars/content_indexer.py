@@ -0,0 +1,208 @@
+import os
+import json
+import asyncio
+import threading
+import multiprocessing
+import pyarrow as pa
+from pypdf import PdfReader
+from concurrent.futures import ProcessPoolExecutor
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from config import settings
+from circulars.downloads import PdfDownloadManager
+from data_ingestion.embedding_cache import CachedEmbeddings, text_hash
+from data_ingestion.index_manager import ensure_index
+from data_ingestion.lance_tables import (
+    ID_KEY, TEXT_KEY, VECTOR_KEY, quote, sql_in, vectorstore_record, vectorstore_schema,
+)
+
+CHUNKS_TABLE = settings.CIRCULAR_CHUNKS_TABLE
+STATE_FILE = os.path.join(settings.PDF_STORAGE, "circular_chunks_state.json")
+METADATA_FIELDS = ["url", "title", "page"]
+PAGES_PER_TASK = 8
+
+# Own directory, so indexing every circular never evicts PDFs kept for
+# users; each file is deleted once its text is indexed
+index_downloads = PdfDownloadManager(
+    os.path.join(settings.PDF_STORAGE, "indexing"), settings.PDF_STORAGE_MAX_MB * 1024 * 1024
+)
+# One indexing run per process (TTL refresh thread, scheduler, explicit runs)
+_index_lock = threading.Lock()
+
+
+def _read_state() -> dict:
+    """
+    {url: hash of the circular's description} for fully indexed circulars.
+    """
+    if os.path.exists(STATE_FILE):
+        try:
+            with open(STATE_FILE, "r") as sf:
+                return json.load(sf)
+        except Exception:
+            pass
+    return {}
+
+
+def _write_state(state: dict) -> None:
+    os.makedirs(settings.PDF_STORAGE, exist_ok=True)
+    tmp = f"{STATE_FILE}.tmp"
+    with open(tmp, "w") as sf:
+        json.dump(state, sf, indent=2)
+    os.replace(tmp, STATE_FILE)
+
+
+def page_count(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def extract_pages(path: str, start: int, end: int) -> list[tuple[int, str]]:
+    """
+    (1-based page number, text) for pages [start, end). Runs in a worker process.
+    """
+    reader = PdfReader(path)
+    pages = []
+    for i in range(start, min(end, len(reader.pages))):
+        try:
+            text = reader.pages[i].extract_text() or ""
+        except Exception:
+            text = ""
+        pages.append((i + 1, " ".join(text.split())))
+    return pages
+
+
+async def _index_one(url: str, title: str, db, embeddings: CachedEmbeddings,
+                     pool: ProcessPoolExecutor, splitter) -> bool:
+    """
+    Download, extract, chunk, embed and store one circular's content,
+    a few pages at a time, then delete the download. Returns True when
+    the whole PDF was indexed.
+    """
+    path = await index_downloads.fetch(url)
+    tasks = []
+    try:
+        loop = asyncio.get_running_loop()
+        pages = await loop.run_in_executor(pool, page_count, path)
+
+        if CHUNKS_TABLE in db.table_names():
+            db.open_table(CHUNKS_TABLE).delete(f"metadata.url = {quote(url)}")
+
+        tasks = [
+            loop.run_in_executor(pool, extract_pages, path, start, start + PAGES_PER_TASK)
+            for start in range(0, pages, PAGES_PER_TASK)
+        ]
+        stored = 0
+        for done in asyncio.as_completed(tasks):
+            records = []
+            for page_no, text in await done:
+                chunks = splitter.split_text(text) if text else []
+                vectors = await asyncio.to_thread(embeddings.embed_many, chunks) if chunks else []
+                for i, (chunk, vec) in enumerate(zip(chunks, vectors)):
+                    if vec is None:
+                        return False
+                    records.append(vectorstore_record(
+                        f"{url}#p{page_no}c{i}", chunk, vec,
+                        {"url": url, "title": title, "page": str(page_no)},
+                    ))
+            if not records:
+                continue
+
+            data = pa.Table.from_pylist(
+                records, schema=vectorstore_schema(len(records[0][VECTOR_KEY]), METADATA_FIELDS)
+            )
+            if CHUNKS_TABLE in db.table_names():
+                db.open_table(CHUNKS_TABLE).add(data)
+            else:
+                db.create_table(CHUNKS_TABLE, data=data)
+            stored += len(records)
+
+        print(f"📄 Indexed {stored} chunks from {pages} pages of \"{title}\"")
+        return True
+    finally:
+        # Let pending extractions finish before their file goes away
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+async def index_circular_contents(db, embeddings: CachedEmbeddings, circulars_table: str) -> int:
+    """
+    Bring the circular_chunks table in line with the circulars index:
+    new or changed circulars are downloaded once and their text indexed
+    (CONTENT_INDEX_CONCURRENCY at a time, page extraction in a pool of
+    CONTENT_INDEX_WORKERS processes); chunks of removed circulars are
+    deleted, and the table is compacted afterwards. Skipped while another
+    run is in progress in this process. Returns the number of circulars
+    indexed.
+    """
+    if not _index_lock.acquire(blocking=False):
+        print("⏭️ Circular content indexing already running; skipping.")
+        return 0
+    try:
+        return await _sync_contents(db, embeddings, circulars_table)
+    finally:
+        _index_lock.release()
+
+
+def _compact(table) -> None:
+    # Each circular wrote its own delete and add versions; fold them into
+    # compacted files before the index catches up
+    table.optimize()
+    ensure_index(table, "cosine")
+
+
+async def _sync_contents(db, embeddings: CachedEmbeddings, circulars_table: str) -> int:
+    if circulars_table not in db.table_names():
+        return 0
+
+    rows = db.open_table(circulars_table).to_arrow().select([ID_KEY, TEXT_KEY]).to_pylist()
+    current = {r[ID_KEY]: (r[TEXT_KEY], text_hash(r[TEXT_KEY])) for r in rows}
+    state = _read_state()
+
+    removed = [url for url in state if url not in current]
+    if removed and CHUNKS_TABLE in db.table_names():
+        db.open_table(CHUNKS_TABLE).delete(sql_in("metadata.url", removed))
+    for url in removed:
+        state.pop(url)
+
+    todo = [url for url, (_, h) in current.items() if state.get(url) != h]
+    if not todo:
+        if removed:
+            _write_state(state)
+        return 0
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.CONTENT_CHUNK_SIZE,
+        chunk_overlap=settings.CONTENT_CHUNK_OVERLAP,
+    )
+    sem = asyncio.Semaphore(max(1, settings.CONTENT_INDEX_CONCURRENCY))
+    indexed = 0
+
+    # Spawned, not forked: forking copies the locks of the caller's other threads
+    workers = max(1, settings.CONTENT_INDEX_WORKERS)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        async def run(url: str) -> None:
+            nonlocal indexed
+            async with sem:
+                try:
+                    ok = await _index_one(url, current[url][0], db, embeddings, pool, splitter)
+                except Exception as e:
+                    print(f"⚠️ Could not index content of {url}: {e}")
+                    return
+            if ok:
+                state[url] = current[url][1]
+                indexed += 1
+
+        await asyncio.gather(*(run(url) for url in todo))
+
+    _write_state(state)
+    if CHUNKS_TABLE in db.table_names():
+        await asyncio.to_thread(_compact, db.open_table(CHUNKS_TABLE))
+    print(f"✅ Circular content indexed for {indexed}/{len(todo)} circulars.")
+    return indexed
+
+
+if __name__ == "__main__":
+    from circulars.circulars_fetcher import index_contents
+
+    index_contents()
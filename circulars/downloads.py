@@ -0,0 +1,125 @@
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+import weakref
+import aiohttp
+from config import settings
+
+# Files used within this many seconds are never evicted: a caller may be
+# about to read a path fetch() just returned
+EVICT_GRACE_SECONDS = 60
+
+
+class PdfDownloadManager:
+    """
+    Async PDF downloader for PDF_STORAGE:
+      * one pooled aiohttp session per event loop (the serving loop and
+        background refresh threads each get their own)
+      * chunked streaming into a temp file, then an atomic rename
+      * concurrent requests for the same URL share a single download
+      * files named by URL hash, evicted least-recently-used (off the event
+        loop) once the directory grows past PDF_STORAGE_MAX_MB
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # loop -> (session holder, in-flight downloads by URL)
+        self._per_loop = weakref.WeakKeyDictionary()
+
+    def path_for(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.directory, f"{digest}.pdf")
+
+    def _loop_state(self) -> tuple[dict, dict[str, asyncio.Task]]:
+        # Sessions and tasks belong to one event loop
+        loop = asyncio.get_running_loop()
+        if loop not in self._per_loop:
+            self._per_loop[loop] = ({"session": None}, {})
+        return self._per_loop[loop]
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        holder, _ = self._loop_state()
+        if holder["session"] is None or holder["session"].closed:
+            holder["session"] = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=settings.DOWNLOAD_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=settings.DOWNLOAD_POOL_SIZE),
+            )
+        return holder["session"]
+
+    async def fetch(self, url: str) -> str:
+        """
+        Path of the PDF for `url`, downloading it unless already stored.
+        Raises on network errors or when the URL does not serve a PDF.
+        """
+        path = self.path_for(url)
+        try:
+            os.utime(path)  # mark as recently used, so eviction leaves it alone
+            return path
+        except FileNotFoundError:
+            pass
+
+        _, inflight = self._loop_state()
+        task = inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._download(url, path))
+            inflight[url] = task
+            task.add_done_callback(lambda _: inflight.pop(url, None))
+        # shield: one caller giving up must not cancel the shared download
+        return await asyncio.shield(task)
+
+    async def _download(self, url: str, path: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            async with self._get_session().get(url) as resp:
+                resp.raise_for_status()
+                if "application/pdf" not in resp.headers.get("Content-Type", ""):
+                    raise ValueError("URL did not return a PDF")
+                with open(tmp, "wb") as f:
+                    async for chunk in resp.content.iter_chunked(settings.DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        await asyncio.to_thread(self._evict, keep=path)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        recent = time.time() - EVICT_GRACE_SECONDS
+        files = []
+        for name in os.listdir(self.directory):
+            full = os.path.join(self.directory, name)
+            if name.endswith(".pdf") and os.path.isfile(full):
+                st = os.stat(full)
+                files.append((st.st_mtime, st.st_size, full))
+
+        total = sum(size for _, size, _ in files)
+        for mtime, size, full in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if full == keep or mtime >= recent:
+                continue
+            try:
+                os.remove(full)
+                total -= size
+                print(f"🧹 Evicted {full} from PDF storage")
+            except OSError:
+                pass
+
+    async def close(self) -> None:
+        """
+        Close the current event loop's session.
+        """
+        holder, _ = self._loop_state()
+        if holder["session"] is not None and not holder["session"].closed:
+            await holder["session"].close()
+
+
+download_manager = PdfDownloadManager(
+    settings.PDF_STORAGE, settings.PDF_STORAGE_MAX_MB * 1024 * 1024
+)
@@ -0,0 +1,85 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+from config import settings
+
+load_dotenv(os.getenv("DOTENV_PATH", ".env"))
+
+# The Gemini SDK is imported on first use: a process that never needs a
+# client (rule-classified identity/unknown queries, tooling) does not pay
+# for importing it.
+
+# Optional replacements for the Gemini constructors (offline benchmarks)
+_factories = {"chat": None, "embeddings": None}
+
+
+def use_factories(chat=None, embeddings=None) -> None:
+    """
+    Build clients with `chat(model, temperature)` and `embeddings(model)`
+    instead of Gemini, e.g. the deterministic fakes in benchmarks.fakes.
+    Clears every client handed out so far.
+    """
+    _factories.update(chat=chat, embeddings=embeddings)
+    for cached in (_chat_model, _embeddings, _query_embeddings, _cached_embeddings):
+        cached.cache_clear()
+
+
+def get_chat_model(model: str | None = None, temperature: float = 0):
+    """
+    Shared Gemini chat client, one per (model, temperature).
+    """
+    return _chat_model(model or settings.GEMINI_CHAT_MODEL, float(temperature))
+
+
+def get_embeddings(model: str | None = None):
+    """
+    Shared Gemini embedding client, one per model, whose query calls are
+    cached and coalesced across concurrent requests (QueryEmbeddings).
+    """
+    return _query_embeddings(model or settings.GEMINI_EMBEDDING_MODEL)
+
+
+def get_cached_embeddings(model: str | None = None):
+    """
+    get_embeddings() behind the content-hash embedding cache table.
+    """
+    return _cached_embeddings(model or settings.GEMINI_EMBEDDING_MODEL)
+
+
+@lru_cache(maxsize=None)
+def _chat_model(model: str, temperature: float):
+    if _factories["chat"]:
+        return _factories["chat"](model, temperature)
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model=model,
+        temperature=temperature,
+        google_api_key=os.getenv("GEMINI_API_KEY"),
+    )
+
+
+@lru_cache(maxsize=None)
+def _embeddings(model: str):
+    if _factories["embeddings"]:
+        return _factories["embeddings"](model)
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    return GoogleGenerativeAIEmbeddings(model=model, google_api_key=os.getenv("GEMINI_API_KEY"))
+
+
+@lru_cache(maxsize=None)
+def _query_embeddings(model: str):
+    from data_ingestion.embedding_cache import QueryEmbeddings
+    from stores import stores
+
+    db = stores.connect() if settings.QUERY_EMBED_CACHE_PERSIST else None
+    return QueryEmbeddings(_embeddings(model), db, model=model)
+
+
+@lru_cache(maxsize=None)
+def _cached_embeddings(model: str):
+    from data_ingestion.embedding_cache import CachedEmbeddings
+    from stores import stores
+
+    return CachedEmbeddings(_query_embeddings(model), stores.connect(), model=model)
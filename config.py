@@ -15,6 +15,9 @@ class Settings(BaseSettings):
     FACULTY_TABLE: str = "faculty"
     RAG_TABLE: str = "faculty_rag"
     CIRCULARS_TABLE: str = "circulars"
+    EMBEDDING_CACHE_TABLE: str = "embedding_cache"
+    CIRCULAR_CHUNKS_TABLE: str = "circular_chunks"
+    STORE_CONSISTENCY_INTERVAL: float = 5.0  # seconds between table version checks
 
     # Faculty scraping
     FACULTY_BASE_URL: AnyHttpUrl = "https://www.mcehassan.ac.in/home/Faculty"
@@ -32,18 +35,106 @@ class Settings(BaseSettings):
         "Mathematics",
     ]
     PAGE_SUFFIXES: list[str] = ["", "/10", "/20"]
+    CRAWL_MODE: str = "browser"  # "browser" (crawl4ai/Playwright) or "http" (aiohttp)
+    CRAWL_CONCURRENCY: int = 6  # pages in flight across departments
+    CRAWL_HOST_DELAY: float = 0.25  # seconds between request starts per host
+    CRAWL_TIMEOUT: int = 30  # seconds per page in http mode
 
     # Circulars page & storage
     CIRCULARS_URL: AnyHttpUrl = "https://www.mcehassan.ac.in/home/Circulars"
     PDF_STORAGE: str = "./data/pdfs"
+    CIRCULARS_TTL_SECONDS: int = 3600  # serve from index, refresh in background after this
+    PDF_STORAGE_MAX_MB: int = 500  # least-recently-used PDFs are evicted beyond this
+    DOWNLOAD_TIMEOUT: int = 20  # seconds per PDF download
+    DOWNLOAD_CHUNK_SIZE: int = 65536  # bytes streamed to disk per chunk
+    DOWNLOAD_POOL_SIZE: int = 8  # pooled connections for PDF downloads
 
-    # Scheduler
-    SCRAPE_HOUR: int = 2  # 2 AM daily
+    # Circular PDF content indexing (requires pypdf)
+    CONTENT_INDEX_ENABLED: bool = True
+    CONTENT_CHUNK_SIZE: int = 800  # characters per chunk
+    CONTENT_CHUNK_OVERLAP: int = 100
+    CONTENT_INDEX_CONCURRENCY: int = 4  # circulars processed at once
+    CONTENT_INDEX_WORKERS: int = 2  # processes extracting PDF pages
+    CONTENT_SEARCH_FANOUT: int = 4  # chunk hits fetched per requested circular
+
+    # Intent classification (rule-based tier before the LLM)
+    LOCAL_INTENT_ENABLED: bool = True
+    LOCAL_INTENT_MIN_SCORE: float = 2.0  # best rule score needed to skip the LLM
+    LOCAL_INTENT_MARGIN: float = 1.5  # lead over the runner-up needed to skip the LLM
+
+    # Faculty retrieval
+    FACULTY_RETRIEVER: str = "hybrid"  # "hybrid" (BM25 + vector, RRF) or "vector"
+    HYBRID_CANDIDATES: int = 50  # candidates per ranking before fusion
+    HYBRID_RRF_K: int = 60  # reciprocal rank fusion constant
+    RETRIEVER_MIN_K: int = 5  # docs for lookups of a person
+    RETRIEVER_MAX_K: int = 30  # docs for listing questions
+    FAST_PATH_ENABLED: bool = True  # answer lookups/listings from the faculty table without the LLM
+    QA_CONTEXT_MODE: str = "compact"  # "compact" (deduplicated table) or "raw" (documents as retrieved)
+    QA_CONTEXT_TOKENS: int = 1500  # compact: token budget for the stuffed context
+
+    # ANN indexes (data_ingestion/index_manager.py)
+    ANN_INDEX_TYPE: str = "auto"  # auto, flat, ivf_pq or ivf_hnsw_sq
+    ANN_FLAT_MAX_ROWS: int = 10_000  # auto: exact search below this size
+    ANN_HNSW_MAX_ROWS: int = 2_000_000  # auto: HNSW below this size, IVF-PQ above
+    ANN_NPROBES: int = 20  # IVF partitions probed per query
+    ANN_REFINE_FACTOR: int = 0  # re-rank k*factor candidates on full vectors; 0 = off
+    ANN_EF: int = 0  # HNSW search breadth; 0 = LanceDB default
+
+    # Response cache (in front of the agent graph)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: int = 86400  # seconds
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512  # LRU-evicted beyond this
+    RESPONSE_CACHE_SEMANTIC: bool = True  # also match similar queries by embedding
+    # Only intents whose answer does not depend on names/departments in the
+    # query: "email of Dr. X" and "email of Dr. Y" embed almost identically
+    RESPONSE_CACHE_SEMANTIC_INTENTS: list[str] = ["identity", "unknown"]
+    RESPONSE_CACHE_THRESHOLD: float = 0.95  # min cosine similarity for a semantic hit
+    RESPONSE_CACHE_INTENTS: list[str] = ["faculty_info", "identity", "unknown"]
+    RESPONSE_CACHE_PATH: str = ""  # optional JSON file backing, e.g. ./data/response_cache.json
+    RESPONSE_CACHE_VERSION_CHECK: int = 30  # seconds between table version checks
+
+    # Streaming (print/send LLM tokens as they are generated)
+    STREAM_RESPONSES: bool = True
+
+    # HTTP server
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8080
+    SERVER_MAX_CONCURRENCY: int = 8  # graph runs in flight (protects the Gemini quota)
+    SERVER_REQUEST_TIMEOUT: int = 60  # seconds per request, including queueing
+    SERVER_SELECTION_TTL: int = 900  # seconds a circular selection stays valid
+
+    # Tracing (per-stage latency, tokens and retrieval sizes; see tracing.py)
+    TRACE_ENABLED: bool = True
+    TRACE_PATH: str = "logs/trace.jsonl"  # one JSON line per request
+    TRACE_PROFILE: str = ""  # "cprofile" or "pyinstrument" to profile each request
+    TRACE_PROFILE_DIR: str = "logs/profiles"
+
+    # Batch queries (batch.py)
+    BATCH_CONCURRENCY: int = 8  # graph runs in flight (protects the Gemini quota)
+
+    # Scheduled refresh (refresh_service.py)
+    SCRAPE_HOUR: int = 2  # circulars: 2 AM daily
+    FACULTY_REFRESH_DAY: str = "sun"  # faculty: weekly re-crawl on this day
+    FACULTY_REFRESH_HOUR: int = 3
+    REFRESH_JITTER: int = 600  # up to this many seconds of random delay per run
+    REFRESH_LOCK_DIR: str = "./data/locks"  # one lock file per job, shared across processes
+    REFRESH_IN_SERVER: bool = False  # run the schedule inside server.py
 
     # Retry/rate-limit
     MAX_RETRIES: int = 5
     RETRY_DELAY: int = 4  # seconds between API calls
 
+    # Query embeddings (faculty retriever, circular search, response cache)
+    QUERY_EMBED_CACHE_SIZE: int = 4096  # in-process LRU entries; 0 = off
+    QUERY_EMBED_CACHE_PERSIST: bool = False  # also keep them in the embedding cache table
+    QUERY_EMBED_BATCH_WINDOW: float = 0.005  # seconds to coalesce concurrent queries; 0 = off
+    QUERY_EMBED_BATCH_MAX: int = 32  # queries per coalesced embed_documents call
+
+    # Batched embedding
+    EMBED_BATCH_SIZE: int = 64  # texts per embed_documents call
+    EMBED_CONCURRENCY: int = 4  # batches in flight at once
+    PIPELINE_QUEUE_SIZE: int = 4  # max items buffered between ingestion stages
+
     class Config:
         env_file = ".env"
         case_sensitive = False
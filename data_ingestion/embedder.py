@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from langchain_core.embeddings import Embeddings
+from config import settings
+
+
+def _batches(indices: list[int], size: int) -> list[list[int]]:
+    return [indices[i:i + size] for i in range(0, len(indices), size)]
+
+
+def embed_texts(client: Embeddings, texts: list[str]) -> list[list[float] | None]:
+    """
+    Embed texts with `embed_documents` in batches of EMBED_BATCH_SIZE, running
+    at most EMBED_CONCURRENCY batches at once. Failed batches (rate limits,
+    transient errors) are retried with exponential backoff starting at
+    RETRY_DELAY; only the rows of failed batches are re-sent. Rows still
+    failing after MAX_RETRIES rounds come back as None.
+    """
+    vectors: list[list[float] | None] = [None] * len(texts)
+    pending = list(range(len(texts)))
+    if not pending:
+        return vectors
+
+    batch_size = max(1, settings.EMBED_BATCH_SIZE)
+    workers = max(1, settings.EMBED_CONCURRENCY)
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for attempt in range(settings.MAX_RETRIES):
+            futures = {
+                pool.submit(client.embed_documents, [texts[i] for i in batch]): batch
+                for batch in _batches(pending, batch_size)
+            }
+            failed = []
+            for fut in as_completed(futures):
+                batch = futures[fut]
+                try:
+                    result = fut.result()
+                    if len(result) != len(batch):
+                        raise ValueError(f"expected {len(batch)} vectors, got {len(result)}")
+                except Exception as e:
+                    print(f"⚠️ Embedding batch of {len(batch)} failed: {e}")
+                    failed.extend(batch)
+                    continue
+                for i, vec in zip(batch, result):
+                    vectors[i] = vec
+
+            pending = sorted(failed)
+            if not pending:
+                break
+            if attempt + 1 < settings.MAX_RETRIES:
+                delay = settings.RETRY_DELAY * (2 ** attempt)
+                print(f"🔁 Retrying {len(pending)} rows in {delay}s "
+                      f"(attempt {attempt + 2}/{settings.MAX_RETRIES})")
+                time.sleep(delay)
+
+    elapsed = time.perf_counter() - start
+    done = len(texts) - len(pending)
+    rate = done / elapsed if elapsed > 0 else float("inf")
+    print(f"⚡ Embedded {done}/{len(texts)} rows in {elapsed:.2f}s ({rate:.1f} rows/sec)")
+    if pending:
+        print(f"❌ {len(pending)} rows failed after {settings.MAX_RETRIES} attempts.")
+    return vectors
@@ -0,0 +1,302 @@
+import asyncio
+import atexit
+import hashlib
+import inspect
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+import pyarrow as pa
+from langchain_core.embeddings import Embeddings
+import tracing
+from config import settings
+from data_ingestion.embedder import embed_texts
+from data_ingestion.lance_tables import quote, sql_in
+
+CACHE_SCHEMA = pa.schema([
+    pa.field('model', pa.string()),
+    pa.field('text_hash', pa.string()),
+    pa.field('vector', pa.list_(pa.float32())),
+])
+LOOKUP_CHUNK = 500
+QUERY_FLUSH_SIZE = 32  # new query vectors buffered before a table write
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper backed by a persistent LanceDB table keyed by
+    (embedding model, normalized text hash). Document embeddings are served
+    from the cache when possible; only new or changed texts reach Gemini,
+    through the batched pipeline in data_ingestion.embedder.
+    """
+
+    def __init__(self, client: Embeddings, db, model: str | None = None,
+                 table_name: str | None = None):
+        self.client = client
+        self.db = db
+        self.model = model or settings.GEMINI_EMBEDDING_MODEL
+        self.table_name = table_name or settings.EMBEDDING_CACHE_TABLE
+
+    def _table(self):
+        if self.table_name in self.db.table_names():
+            return self.db.open_table(self.table_name)
+        return None
+
+    def _lookup(self, hashes: list[str]) -> dict[str, list[float]]:
+        table = self._table()
+        if table is None or not hashes:
+            return {}
+
+        found = {}
+        for i in range(0, len(hashes), LOOKUP_CHUNK):
+            chunk = hashes[i:i + LOOKUP_CHUNK]
+            where = f"model = {quote(self.model)} AND {sql_in('text_hash', chunk)}"
+            hits = (table.search().where(where)
+                    .select(['text_hash', 'vector'])
+                    .limit(len(chunk)).to_arrow().to_pylist())
+            found.update((h['text_hash'], h['vector']) for h in hits)
+        return found
+
+    def _store(self, entries: dict[str, list[float]]) -> None:
+        if not entries:
+            return
+        data = pa.Table.from_pylist([
+            {'model': self.model, 'text_hash': h, 'vector': v}
+            for h, v in entries.items()
+        ], schema=CACHE_SCHEMA)
+
+        table = self._table()
+        try:
+            if table is None:
+                self.db.create_table(self.table_name, data=data, schema=CACHE_SCHEMA)
+            else:
+                (table.merge_insert(['model', 'text_hash'])
+                 .when_not_matched_insert_all()
+                 .execute(data))
+        except Exception as e:
+            print(f"⚠️ Could not update embedding cache: {e}")
+
+    def embed_many(self, texts: list[str]) -> list[list[float] | None]:
+        """
+        Like embed_documents, but rows that could not be embedded come
+        back as None instead of failing the whole call.
+        """
+        hashes = [text_hash(t) for t in texts]
+        cached = self._lookup(sorted(set(hashes)))
+
+        misses = {}
+        for h, t in zip(hashes, texts):
+            if h not in cached and h not in misses:
+                misses[h] = t
+
+        tracing.count("embedding_cache_hits", len(texts) - len(misses))
+        tracing.count("embedding_cache_misses", len(misses))
+        fresh = {}
+        if misses:
+            with tracing.span("embed.documents", texts=len(misses)):
+                vectors = embed_texts(self.client, list(misses.values()))
+            fresh = {h: v for h, v in zip(misses, vectors) if v is not None}
+            self._store(fresh)
+
+        print(f"🗃️ Embedding cache: {len(texts) - len(misses)} hits, {len(misses)} misses")
+        return [cached.get(h) or fresh.get(h) for h in hashes]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.embed_many(texts)
+        missing = sum(v is None for v in vectors)
+        if missing:
+            raise RuntimeError(f"{missing} of {len(texts)} texts could not be embedded")
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        with tracing.span("embed.query"):
+            return self.client.embed_query(text)
+
+
+# Query vectors embedded ahead of time for the current batch (see primed_queries)
+_primed: ContextVar[dict[str, list[float]] | None] = ContextVar("primed_query_vectors", default=None)
+
+
+@contextmanager
+def primed_queries(vectors: dict[str, list[float]]):
+    """
+    Serve these precomputed query vectors (keyed by normalize_text) from
+    QueryEmbeddings.embed_query in this context and the tasks it starts.
+    """
+    token = _primed.set(vectors)
+    try:
+        yield
+    finally:
+        _primed.reset(token)
+
+
+class _QueryBatcher:
+    """
+    Coalesces embed_query calls from concurrent threads: the first caller
+    waits `window` seconds (or until `max_size` queries are pending), then
+    embeds the whole batch in one call and hands every caller its vector.
+    Callers asking for a text already pending share its result.
+    """
+
+    def __init__(self, embed_batch, window: float, max_size: int):
+        self.embed_batch = embed_batch
+        self.window = window
+        self.max_size = max(1, max_size)
+        self._lock = threading.Lock()
+        self._pending: dict[str, Future] = {}
+        self._full = threading.Event()
+
+    def embed(self, text: str) -> list[float]:
+        with self._lock:
+            future = self._pending.get(text)
+            leader = False
+            if future is None:
+                future = self._pending[text] = Future()
+                leader = len(self._pending) == 1
+                if len(self._pending) >= self.max_size:
+                    self._full.set()
+
+        if leader:
+            self._full.wait(self.window)
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._full.clear()
+            try:
+                vectors = self.embed_batch(list(batch))
+                for f, vector in zip(batch.values(), vectors):
+                    f.set_result(vector)
+            except Exception as e:
+                for f in batch.values():
+                    f.set_exception(e)
+        return future.result()
+
+
+class QueryEmbeddings(Embeddings):
+    """
+    Wrapper for query-time embedding calls (faculty retriever, circular
+    search, response cache). Vectors are served, in order, from queries
+    primed for the current batch, an in-process LRU, and optionally the
+    embedding cache table; misses from concurrent requests are coalesced
+    into one embed_documents call (_QueryBatcher).
+    """
+
+    def __init__(self, client: Embeddings, db=None, model: str | None = None,
+                 cache_size: int | None = None, window: float | None = None,
+                 batch_size: int | None = None):
+        self.client = client
+        self.model = model or settings.GEMINI_EMBEDDING_MODEL
+        self.cache_size = settings.QUERY_EMBED_CACHE_SIZE if cache_size is None else cache_size
+        window = settings.QUERY_EMBED_BATCH_WINDOW if window is None else window
+        batch_size = settings.QUERY_EMBED_BATCH_MAX if batch_size is None else batch_size
+        self._lru: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._batcher = _QueryBatcher(self._embed_queries, window, batch_size) if window > 0 else None
+        # Query vectors get their own key space: Gemini embeds queries and
+        # documents with different task types
+        self._store = CachedEmbeddings(client, db, model=f"{self.model}:query") if db is not None else None
+        self._unsaved: dict[str, list[float]] = {}
+        if self._store is not None:
+            atexit.register(self.flush)
+
+    def _embed_queries(self, texts: list[str]) -> list[list[float]]:
+        # Gemini embeds queries with a different task type than documents
+        if "task_type" in inspect.signature(self.client.embed_documents).parameters:
+            return self.client.embed_documents(texts, task_type="RETRIEVAL_QUERY")
+        return self.client.embed_documents(texts)
+
+    def prime(self, texts: list[str]) -> dict[str, list[float]]:
+        """
+        Embed queries in EMBED_BATCH_SIZE batches; failed batches are left
+        out and fall back to embed_query when the query runs.
+        """
+        texts = list(dict.fromkeys(normalize_text(t) for t in texts))
+        size = max(1, settings.EMBED_BATCH_SIZE)
+        vectors = {}
+        for i in range(0, len(texts), size):
+            batch = texts[i:i + size]
+            try:
+                vectors.update(zip(batch, self._embed_queries(batch)))
+            except Exception as e:
+                print(f"⚠️ Could not pre-embed {len(batch)} queries: {e}")
+        for text, vector in vectors.items():
+            self._remember(text, vector)
+        return vectors
+
+    def _in_memory(self, key: str) -> list[float] | None:
+        primed = _primed.get()
+        if primed and key in primed:
+            return primed[key]
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+            return vector
+
+    def _cached(self, key: str) -> list[float] | None:
+        vector = self._in_memory(key)
+        if vector is not None:
+            return vector
+        if self._store is not None:
+            vector = self._store._lookup([text_hash(key)]).get(text_hash(key))
+            if vector is not None:
+                self._remember(key, vector, persist=False)
+                return vector
+        return None
+
+    def _remember(self, key: str, vector: list[float], persist: bool = True) -> None:
+        flush = False
+        with self._lock:
+            if self.cache_size > 0:
+                self._lru[key] = vector
+                self._lru.move_to_end(key)
+                while len(self._lru) > self.cache_size:
+                    self._lru.popitem(last=False)
+            if persist and self._store is not None:
+                self._unsaved[text_hash(key)] = vector
+                flush = len(self._unsaved) >= QUERY_FLUSH_SIZE
+        if flush:
+            threading.Thread(target=self.flush, daemon=True).start()
+
+    def flush(self) -> None:
+        """
+        Write query vectors not yet in the embedding cache table.
+        """
+        with self._lock:
+            entries, self._unsaved = self._unsaved, {}
+        if entries and self._store is not None:
+            self._store._store(entries)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.client.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = normalize_text(text)
+        vector = self._cached(key)
+        if vector is not None:
+            tracing.count("query_embedding_cache_hits")
+            return vector
+        tracing.count("query_embedding_cache_misses")
+        if self._batcher is not None:
+            vector = self._batcher.embed(key)
+        else:
+            vector = self.client.embed_query(key)
+        self._remember(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        vector = self._in_memory(normalize_text(text))
+        if vector is not None:
+            tracing.count("query_embedding_cache_hits")
+            return vector
+        # Table lookups and coalescing block, so they run in a worker thread
+        return await asyncio.to_thread(self.embed_query, text)
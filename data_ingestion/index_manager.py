@@ -0,0 +1,130 @@
+import math
+from dataclasses import dataclass, field
+from config import settings
+from data_ingestion.lance_tables import VECTOR_KEY
+
+# LanceDB index_type for each plan kind
+INDEX_TYPES = {"ivf_pq": "IVF_PQ", "ivf_hnsw_sq": "IVF_HNSW_SQ"}
+PQ_MIN_ROWS = 256  # PQ trains 256 centroids per sub-vector
+
+
+@dataclass
+class IndexPlan:
+    kind: str  # flat, ivf_pq or ivf_hnsw_sq
+    params: dict = field(default_factory=dict)
+
+
+def _sub_vectors(dim: int) -> int:
+    """
+    Most PQ sub-vectors that divide `dim` into chunks of a multiple of 8
+    dimensions and at least 16 wide (768 -> 48).
+    """
+    for width in [*range(16, dim + 1, 8), *range(8, dim + 1)]:
+        if dim % width == 0:
+            return dim // width
+    return 1
+
+
+def plan_index(num_rows: int, dim: int) -> IndexPlan:
+    """
+    Index type and build parameters for a table of `num_rows` vectors of
+    `dim` dimensions. Small tables stay flat (exact search is both faster
+    and perfectly accurate there); HNSW serves mid-sized tables; IVF-PQ
+    keeps very large tables compact.
+    """
+    kind = settings.ANN_INDEX_TYPE
+    if kind == "auto":
+        if num_rows < settings.ANN_FLAT_MAX_ROWS:
+            kind = "flat"
+        elif num_rows < settings.ANN_HNSW_MAX_ROWS:
+            kind = "ivf_hnsw_sq"
+        else:
+            kind = "ivf_pq"
+    if kind == "ivf_pq" and num_rows < PQ_MIN_ROWS:
+        kind = "flat"
+    return IndexPlan(kind, index_params(kind, num_rows, dim))
+
+
+def index_params(kind: str, num_rows: int, dim: int) -> dict:
+    """
+    create_index parameters for an index of `kind` over the given table shape.
+    """
+    if kind == "ivf_pq":
+        return {
+            "num_partitions": max(1, int(math.sqrt(num_rows))),
+            "num_sub_vectors": _sub_vectors(dim),
+        }
+    if kind == "ivf_hnsw_sq":
+        # HNSW does the fine-grained search; partitions only keep each graph
+        # to roughly a million vectors
+        return {"num_partitions": max(1, num_rows // 1_000_000)}
+    return {}
+
+
+def _vector_index(table, column: str):
+    for idx in table.list_indices():
+        if column in idx.columns:
+            return idx
+    return None
+
+
+def _same_kind(index_type: str, kind: str) -> bool:
+    return index_type.replace("_", "").lower() == kind.replace("_", "").lower()
+
+
+def ensure_index(table, metric: str = "cosine", column: str = VECTOR_KEY,
+                 rebuild: bool = False) -> IndexPlan:
+    """
+    Bring the vector index of `table` in line with its current size: build
+    it when the plan calls for one, fold new rows into an existing index
+    after incremental writes, and rebuild it when the planned type changed
+    or the table more than doubled since it was trained.
+    """
+    num_rows = table.count_rows()
+    if not num_rows:
+        return IndexPlan("flat")
+    dim = table.schema.field(column).type.list_size
+    plan = plan_index(num_rows, dim)
+    existing = _vector_index(table, column)
+
+    if plan.kind == "flat":
+        if existing is not None:
+            print(f"ℹ️ {table.name}: {num_rows} rows; keeping existing {existing.index_type} index.")
+        return plan
+
+    if existing is not None and not rebuild and _same_kind(existing.index_type, plan.kind):
+        stats = table.index_stats(existing.name)
+        if stats.num_unindexed_rows <= stats.num_indexed_rows:
+            if stats.num_unindexed_rows:
+                table.optimize()
+                print(f"🧩 {table.name}: {stats.num_unindexed_rows} new rows added to the index.")
+            return plan
+
+    print(f"🧠 {table.name}: building {plan.kind} index {plan.params} over {num_rows}x{dim} vectors")
+    table.create_index(
+        metric=metric,
+        vector_column_name=column,
+        index_type=INDEX_TYPES[plan.kind],
+        replace=True,
+        **plan.params,
+    )
+    return plan
+
+
+def tune_search(search, nprobes: int | None = None, refine_factor: int | None = None,
+                ef: int | None = None):
+    """
+    Apply the per-query ANN settings (ANN_NPROBES, ANN_REFINE_FACTOR,
+    ANN_EF unless overridden) to a vector query builder. They only take
+    effect when the table has an index.
+    """
+    nprobes = settings.ANN_NPROBES if nprobes is None else nprobes
+    refine_factor = settings.ANN_REFINE_FACTOR if refine_factor is None else refine_factor
+    ef = settings.ANN_EF if ef is None else ef
+    if nprobes:
+        search = search.nprobes(nprobes)
+    if refine_factor:
+        search = search.refine_factor(refine_factor)
+    if ef:
+        search = search.ef(ef)
+    return search
@@ -0,0 +1,63 @@
+import pyarrow as pa
+
+# Column names used by langchain_community.vectorstores.LanceDB
+VECTOR_KEY = "vector"
+ID_KEY = "id"
+TEXT_KEY = "text"
+
+
+def quote(value: str) -> str:
+    """
+    Quote a string literal for a LanceDB SQL filter.
+    """
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def sql_in(column: str, values) -> str:
+    return f"{column} IN ({', '.join(quote(v) for v in values)})"
+
+
+def vectorstore_schema(dim: int, metadata_fields: list[str]) -> pa.Schema:
+    """
+    Arrow schema of a table that the LangChain LanceDB vector store can
+    read back as Documents (text -> page_content, metadata -> metadata).
+    """
+    return pa.schema([
+        pa.field(VECTOR_KEY, pa.list_(pa.float32(), dim)),
+        pa.field(ID_KEY, pa.string()),
+        pa.field(TEXT_KEY, pa.string()),
+        pa.field("metadata", pa.struct([pa.field(f, pa.string()) for f in metadata_fields])),
+    ])
+
+
+def vectorstore_record(id: str, text: str, vector: list[float], metadata: dict) -> dict:
+    return {VECTOR_KEY: vector, ID_KEY: id, TEXT_KEY: text, "metadata": metadata}
+
+
+def faculty_schema(dim: int) -> pa.Schema:
+    return pa.schema([
+        pa.field('name', pa.string()),
+        pa.field('designation', pa.string()),
+        pa.field('qualification', pa.string()),
+        pa.field('phone', pa.string()),
+        pa.field('email', pa.string()),
+        pa.field('img_url', pa.string()),
+        pa.field('department', pa.string()),
+        pa.field('embedding', pa.list_(pa.float32(), dim))
+    ])
+
+
+def faculty_text(row: dict) -> str:
+    """
+    The text embedded for a faculty row, and the page_content retrieval
+    serves for it, so vectors and context never drift apart.
+    """
+    return (f"{row['name']} {row['designation']} {row['qualification']} "
+            f"{row['phone']} {row['email']} {row['department']}").strip()
+
+
+def department_label(dept: str) -> str:
+    """
+    The department value stored in the faculty tables for a DEPARTMENTS slug.
+    """
+    return dept.replace("-", " ").replace("(AI&ML)", "AI & ML")
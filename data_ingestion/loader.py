@@ -1,24 +1,25 @@
-import os
+import asyncio
 import pyarrow as pa
-import lancedb
-from dotenv import load_dotenv
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from typing import AsyncIterator
+from clients import get_cached_embeddings
 from config import settings
-
-load_dotenv()
-db = lancedb.connect(settings.LANCEDB_PATH)
-
-# Embedding client
-emb_client = GoogleGenerativeAIEmbeddings(
-    model=settings.GEMINI_EMBEDDING_MODEL,
-    google_api_key=os.getenv('GEMINI_API_KEY')
+from stores import stores
+from data_ingestion.embedding_cache import text_hash
+from data_ingestion.index_manager import ensure_index
+from data_ingestion.lance_tables import (
+    faculty_schema, faculty_text, vectorstore_record, vectorstore_schema,
 )
 
-def store_in_lancedb(data: list[list]):
-    if not data:
-        print("⚠️ No data to store."); return
+STAGING_TABLE = f"{settings.FACULTY_TABLE}_staging"
+_DONE = object()
 
-    rows = []
+
+def embed_records(data: list[list]) -> list[dict]:
+    """
+    Embed scraped faculty records and return table rows; malformed
+    records and rows that could not be embedded are skipped.
+    """
+    records, texts = [], []
     for r in data:
         try:
             name, desig, qual, phone, email, img_url, dept = r
@@ -26,38 +27,179 @@ def store_in_lancedb(data: list[list]):
             print(f"⚠️ Skipping malformed record: {r}")
             continue
 
-        text = f"{name} {desig} {qual} {phone} {email} {dept}".strip()
-        try:
-            vec = emb_client.embed_query(text)
-        except Exception as e:
-            print(f"Error embedding {name}: {e}")
+        records.append((name, desig, qual, phone, email, img_url, dept))
+        texts.append(faculty_text({
+            'name': name, 'designation': desig, 'qualification': qual,
+            'phone': phone, 'email': email, 'department': dept,
+        }))
+
+    vectors = get_cached_embeddings().embed_many(texts) if texts else []
+
+    rows = []
+    for (name, desig, qual, phone, email, img_url, dept), vec in zip(records, vectors):
+        if vec is None:
+            print(f"Error embedding {name}: no vector after retries")
             continue
 
         rows.append({
-            'name': name, 
-            'designation': desig, 
+            'name': name,
+            'designation': desig,
             'qualification': qual,
-            'phone': phone, 
-            'email': email, 
-            'img_url': img_url, 
+            'phone': phone,
+            'email': email,
+            'img_url': img_url,
             'department': dept,
             'embedding': vec
         })
+    return rows
 
+
+def store_in_lancedb(data: list[list], path: str | None = None):
+    if not data:
+        print("⚠️ No data to store."); return
+
+    rows = embed_records(data)
     if not rows:
         print("❌ All embeddings failed."); return
 
-    dim = len(rows[0]['embedding'])
-    schema = pa.schema([
-        pa.field('name', pa.string()), 
-        pa.field('designation', pa.string()),
-        pa.field('qualification', pa.string()), 
-        pa.field('phone', pa.string()),
-        pa.field('email', pa.string()), 
-        pa.field('img_url', pa.string()),
-        pa.field('department', pa.string()),
-        pa.field('embedding', pa.list_(pa.float32(), dim))
-    ])
-
-    db.create_table(settings.FACULTY_TABLE, data=rows, schema=schema, mode='overwrite')
+    schema = faculty_schema(len(rows[0]['embedding']))
+    stores.connect(path).create_table(settings.FACULTY_TABLE, data=rows, schema=schema, mode='overwrite')
     print(f"✅ {len(rows)} records stored in LanceDB.")
+    build_rag_table(path)
+
+
+def build_rag_table(path: str | None = None):
+    """
+    Derive the faculty_rag table (LangChain LanceDB layout) from the vectors
+    already stored in the faculty table, without any new embedding calls,
+    and index it once it is large enough. Readers switch to the new faculty
+    and faculty_rag versions together, once both are complete. Returns the
+    number of rows written.
+    """
+    conn = stores.connect(path)
+    if settings.FACULTY_TABLE not in conn.table_names():
+        raise RuntimeError("❌ Missing 'faculty' table. Run the scraper/loader first.")
+
+    rows = conn.open_table(settings.FACULTY_TABLE).to_arrow().to_pylist()
+    if not rows:
+        print("⚠️ Faculty table is empty; faculty_rag left unchanged.")
+        return 0
+
+    records = [
+        vectorstore_record(
+            id=text_hash(f"{row['department']}|{row['name']}|{row['email']}"),
+            text=faculty_text(row),
+            vector=row['embedding'],
+            metadata={
+                "name": row["name"],
+                "designation": row["designation"],
+                "qualification": row["qualification"],
+                "department": row["department"],
+                "email": row["email"],
+                "phone": row["phone"],
+                "image": row["img_url"],
+            },
+        )
+        for row in rows
+    ]
+    schema = vectorstore_schema(
+        len(rows[0]['embedding']),
+        ["name", "designation", "qualification", "department", "email", "phone", "image"],
+    )
+    table = conn.create_table(settings.RAG_TABLE, data=pa.Table.from_pylist(records, schema=schema),
+                              mode='overwrite')
+    print(f"✅ {len(records)} rows published to {settings.RAG_TABLE} (no re-embedding).")
+    ensure_index(table, metric="cosine")
+    stores.publish([settings.FACULTY_TABLE, settings.RAG_TABLE], path)
+    return len(records)
+
+
+def _staged_batches(table) -> pa.RecordBatchReader:
+    """
+    Stream a table back EMBED_BATCH_SIZE rows at a time, so publishing
+    never holds the whole staging table in memory.
+    """
+    return table.search().to_batches(max(1, settings.EMBED_BATCH_SIZE))
+
+
+def _publish_staging(staging, schema: pa.Schema, path: str | None = None) -> None:
+    """
+    Swap the staged rows into the live faculty table. The overwrite is a
+    single version commit, so readers see either the old or the new table.
+    """
+    stores.connect(path).create_table(settings.FACULTY_TABLE, data=_staged_batches(staging),
+                                      schema=schema, mode='overwrite')
+
+
+async def stream_into_lancedb(pages: AsyncIterator[list[list]], path: str | None = None) -> int:
+    """
+    Streaming ingestion: scraped pages -> batches of EMBED_BATCH_SIZE ->
+    EMBED_CONCURRENCY embedding workers -> Arrow record batches appended to a
+    staging table, with PIPELINE_QUEUE_SIZE-bounded queues between stages.
+    The live faculty table is only replaced once everything is staged.
+    Writes to the LanceDB at `path` (default LANCEDB_PATH) and returns the
+    number of rows published.
+    """
+    conn = stores.connect(path)
+    queue_size = max(1, settings.PIPELINE_QUEUE_SIZE)
+    batch_size = max(1, settings.EMBED_BATCH_SIZE)
+    workers = max(1, settings.EMBED_CONCURRENCY)
+    embed_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    write_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    state = {"staging": None, "schema": None, "rows": 0}
+
+    async def batcher():
+        pending = []
+        async for page in pages:
+            pending.extend(page)
+            while len(pending) >= batch_size:
+                await embed_q.put(pending[:batch_size])
+                pending = pending[batch_size:]
+        if pending:
+            await embed_q.put(pending)
+        for _ in range(workers):
+            await embed_q.put(_DONE)
+
+    async def embedder():
+        while (batch := await embed_q.get()) is not _DONE:
+            rows = await asyncio.to_thread(embed_records, batch)
+            if rows:
+                await write_q.put(rows)
+        await write_q.put(_DONE)
+
+    async def writer():
+        finished = 0
+        while finished < workers:
+            rows = await write_q.get()
+            if rows is _DONE:
+                finished += 1
+                continue
+            if state["schema"] is None:
+                state["schema"] = faculty_schema(len(rows[0]['embedding']))
+            batch = pa.RecordBatch.from_pylist(rows, schema=state["schema"])
+            if state["staging"] is None:
+                state["staging"] = await asyncio.to_thread(
+                    conn.create_table, STAGING_TABLE, data=[batch],
+                    schema=state["schema"], mode='overwrite'
+                )
+            else:
+                await asyncio.to_thread(state["staging"].add, [batch])
+            state["rows"] += len(rows)
+
+    try:
+        # TaskGroup cancels the remaining stages if any of them fails
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(batcher())
+            tg.create_task(writer())
+            for _ in range(workers):
+                tg.create_task(embedder())
+        if not state["rows"]:
+            print("❌ No faculty rows embedded; live table left untouched.")
+            return 0
+        await asyncio.to_thread(_publish_staging, state["staging"], state["schema"], path)
+        print(f"✅ {state['rows']} records stored in LanceDB.")
+        await asyncio.to_thread(build_rag_table, path)
+        return state["rows"]
+    finally:
+        if STAGING_TABLE in conn.table_names():
+            conn.drop_table(STAGING_TABLE)
@@ -1,58 +1,159 @@
+import time
 import asyncio
+import aiohttp
+from typing import AsyncIterator
+from urllib.parse import urlsplit
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
 from bs4 import BeautifulSoup
 from config import settings
-from data_ingestion.loader import store_in_lancedb
+from data_ingestion.lance_tables import department_label
+from data_ingestion.loader import stream_into_lancedb
+
+
+class HostThrottle:
+    """
+    Per-host politeness: spaces out request starts to the same host by
+    CRAWL_HOST_DELAY seconds while requests to other hosts proceed.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._last: dict[str, float] = {}
+
+    async def wait(self, url: str) -> None:
+        host = urlsplit(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            gap = self._last.get(host, 0.0) + self.delay - time.monotonic()
+            if gap > 0:
+                await asyncio.sleep(gap)
+            self._last[host] = time.monotonic()
+
+
+def parse_faculty_cards(html: str, dept_clean: str) -> list[list]:
+    soup = BeautifulSoup(html, 'html.parser')
+    cards = soup.select('div.upcoming-events.media.maxwidth400.bg-light.mb-20')
+
+    data = []
+    for div in cards:
+        name = div.select_one('h4.name')
+        desig = div.select_one('h5.occupation')
+        qual = div.select_one('h5.qualification')
+        add = div.select_one('h5.additional')
+        img = div.select_one('img')
+
+        phone = email = ''
+        if add:
+            for span in add.find_all('span'):
+                text = span.get_text(strip=True)
+                html = span.decode()
+                if 'fa-phone' in html:
+                    phone = text
+                if 'fa-envelope-o' in html:
+                    email = text
+
+        data.append([
+            name.get_text(strip=True) if name else '',
+            desig.get_text(strip=True) if desig else '',
+            qual.get_text(strip=True) if qual else '',
+            phone,
+            email,
+            img['src'] if img and img.has_attr('src') else '',
+            dept_clean
+        ])
+    return data
+
+
+async def crawl_department(fetch, dept: str, emit) -> None:
+    """
+    Crawl one department's pages in order, passing each page's records to
+    `emit` and stopping at the first page without faculty cards.
+    """
+    dept_clean = department_label(dept)
+    for suffix in settings.PAGE_SUFFIXES:
+        url = f"{settings.FACULTY_BASE_URL}/{dept}{suffix}"
+        html = await fetch(url)
+        if html is None:
+            print(f"❌ Crawl failed: {url}")
+            continue
+
+        cards = parse_faculty_cards(html, dept_clean)
+        if not cards:
+            break
+        await emit(cards)
+
+
+async def crawl_faculty_pages() -> AsyncIterator[list[list]]:
+    """
+    Crawl all departments concurrently (at most CRAWL_CONCURRENCY pages in
+    flight, CRAWL_HOST_DELAY apart per host) and yield each page's records
+    as soon as it is parsed. Pages pass through a PIPELINE_QUEUE_SIZE-bounded
+    queue, so crawling pauses while downstream stages catch up.
+    CRAWL_MODE "http" fetches the static pages with aiohttp instead of a
+    headless browser.
+    """
+    sem = asyncio.Semaphore(max(1, settings.CRAWL_CONCURRENCY))
+    throttle = HostThrottle(settings.CRAWL_HOST_DELAY)
+    pages: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.PIPELINE_QUEUE_SIZE))
+    start = time.perf_counter()
+    count = 0
+
+    async def crawl_all(fetch_page):
+        async def fetch(url: str) -> str | None:
+            async with sem:
+                await throttle.wait(url)
+                try:
+                    return await fetch_page(url)
+                except Exception as e:
+                    print(f"⚠️ Error fetching {url}: {e}")
+                    return None
+
+        await asyncio.gather(*(crawl_department(fetch, d, pages.put)
+                               for d in settings.DEPARTMENTS))
+
+    async def crawl_with_configured_fetcher():
+        if settings.CRAWL_MODE == "http":
+            timeout = aiohttp.ClientTimeout(total=settings.CRAWL_TIMEOUT)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async def fetch_page(url: str) -> str | None:
+                    async with session.get(url) as resp:
+                        if resp.status != 200:
+                            return None
+                        return await resp.text()
+
+                await crawl_all(fetch_page)
+        else:
+            browser_cfg = BrowserConfig(headless=True)
+            run_cfg = CrawlerRunConfig()
+            async with AsyncWebCrawler(config=browser_cfg) as crawler:
+                async def fetch_page(url: str) -> str | None:
+                    result = await crawler.arun(url=url, config=run_cfg)
+                    return result.html if result.success else None
+
+                await crawl_all(fetch_page)
+
+    async def produce():
+        try:
+            await crawl_with_configured_fetcher()
+        finally:
+            await pages.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (page := await pages.get()) is not None:
+            count += len(page)
+            yield page
+        await producer
+    finally:
+        producer.cancel()
+
+    print(f"🕸️ Crawled {count} faculty records from {len(settings.DEPARTMENTS)} "
+          f"departments in {time.perf_counter() - start:.2f}s ({settings.CRAWL_MODE} mode)")
+
 
 async def extract_and_store_faculty_data():
-    browser_cfg = BrowserConfig(headless=True)
-    run_cfg = CrawlerRunConfig()
-    all_data = []
-
-    async with AsyncWebCrawler(config=browser_cfg) as crawler:
-        for dept in settings.DEPARTMENTS:
-            dept_clean = dept.replace("-", " ").replace("(AI&ML)", "AI & ML")
-            for suffix in settings.PAGE_SUFFIXES:
-                url = f"{settings.FACULTY_BASE_URL}/{dept}{suffix}"
-                result = await crawler.arun(url=url, config=run_cfg)
-                if not result.success:
-                    print(f"❌ Crawl failed: {url}")
-                    continue
-
-                soup = BeautifulSoup(result.html, 'html.parser')
-                cards = soup.select('div.upcoming-events.media.maxwidth400.bg-light.mb-20')
-                if not cards:
-                    break
-
-                for div in cards:
-                    name = div.select_one('h4.name')
-                    desig = div.select_one('h5.occupation')
-                    qual = div.select_one('h5.qualification')
-                    add = div.select_one('h5.additional')
-                    img = div.select_one('img')
-
-                    phone = email = ''
-                    if add:
-                        for span in add.find_all('span'):
-                            text = span.get_text(strip=True)
-                            html = span.decode()
-                            if 'fa-phone' in html:
-                                phone = text
-                            if 'fa-envelope-o' in html:
-                                email = text
-
-                    all_data.append([
-                        name.get_text(strip=True) if name else '',
-                        desig.get_text(strip=True) if desig else '',
-                        qual.get_text(strip=True) if qual else '',
-                        phone,
-                        email,
-                        img['src'] if img and img.has_attr('src') else '',
-                        dept_clean
-                    ])
-
-    if all_data:
-        store_in_lancedb(all_data)
+    await stream_into_lancedb(crawl_faculty_pages())
 
 if __name__ == '__main__':
     asyncio.run(extract_and_store_faculty_data())
@@ -1,51 +1,73 @@
-import os
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
+from functools import lru_cache
 from langgraph.graph import StateGraph
-from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_core.messages import HumanMessage, SystemMessage
-from dotenv import load_dotenv
 
-from llm_module.intent_recognizer import recognize_intent
+from llm_module.intent_recognizer import arecognize_intent
+from llm_module.local_intent import classify_local
+from clients import get_chat_model, get_embeddings
 from qa_system.retriever import setup_qa_chain
-from circulars.circulars_fetcher import handle_pdf_scraping
+from qa_system.fast_path import answer_directly, get_directory
+from circulars.circulars_fetcher import search_circulars, format_candidates
 from config import settings
-
-load_dotenv()
+from response_cache import ResponseCache
+from stores import stores
+import tracing
+from tracing import traced_node
 
 class AgentState(dict):
     query: str
     intent: str = ""
     result: str = ""
+    candidates: list = []  # circulars offered for selection (pdf_request)
 
-# Preload faculty QA RAG chain
-doc_qa_chain = setup_qa_chain()
+# Faculty QA RAG chain, built on the first faculty query that needs it
+@lru_cache(maxsize=1)
+def get_qa_chain():
+    return setup_qa_chain()
 
-# 🔧 Dedicated Gemini LLM instance for identity flow
-identity_llm = ChatGoogleGenerativeAI(
-    model=settings.GEMINI_CHAT_MODEL,
-    temperature=0.3,
-    google_api_key=os.getenv("GEMINI_API_KEY")
-)
 
-# Node: Classify intent
+# Node: Classify intent (the only classification per query; the final
+# state carries it back to the caller for logging). Batch runs classify
+# up front and pass the intent in.
+@traced_node("classify")
 async def classify(state: AgentState):
-    state["intent"] = recognize_intent(state["query"])
+    if not state.get("intent"):
+        state["intent"] = await arecognize_intent(state["query"])
     return state
 
-# Node: Faculty data from RAG
-async def faculty_flow(state: AgentState):
-    resp = await doc_qa_chain.ainvoke({"query": state["query"]})
+# Node: Faculty data via RAG (the structured fast path already ran in
+# _fast_path_state, before the graph)
+@traced_node("faculty")
+async def faculty_flow(state: AgentState, config: RunnableConfig):
+    try:
+        # First use opens faculty_rag and builds the lexical index
+        qa_chain = await asyncio.to_thread(get_qa_chain)
+    except RuntimeError as e:
+        state["result"] = f"{e}"
+        return state
+
+    # Passing config through lets astream_events surface the LLM's tokens
+    resp = await qa_chain.ainvoke({"query": state["query"]}, config=config)
     state["result"] = resp["result"]
     return state
 
-# Node: Scrape circular PDFs
+# Node: Circular candidates — selection & download happen outside the
+# graph (select_circular), so no request ever blocks on stdin
+@traced_node("circular")
 async def circular_flow(state: AgentState):
-    result = handle_pdf_scraping(state["query"])  # no await
-    state["result"] = result
+    candidates = await asyncio.to_thread(search_circulars, state["query"])
+    state["candidates"] = candidates
+    if candidates:
+        state["result"] = format_candidates(state["query"], candidates)
+    else:
+        state["result"] = "❌ No matching circulars found."
     return state
 
 # ✅ Node: Dynamic identity answer using chat history messages
-async def identity_flow(state: AgentState):
+@traced_node("identity")
+async def identity_flow(state: AgentState, config: RunnableConfig):
     system_msg = SystemMessage(
         content=(
             "You are NovaCite, a helpful assistant built for Malnad College of Engineering, "
@@ -55,11 +77,13 @@ async def identity_flow(state: AgentState):
     )
     human_msg = HumanMessage(content=state["query"])
 
-    result = await identity_llm.ainvoke([system_msg, human_msg])
+    # Shared Gemini client for the identity flow's temperature
+    result = await get_chat_model(temperature=0.3).ainvoke([system_msg, human_msg], config=config)
     state["result"] = result.content
     return state
 
 # Node: Unknown intent
+@traced_node("unknown")
 async def unknown_flow(state: AgentState):
     state["result"] = (
         "❓ Sorry, I can only help with faculty info or college circulars.\n"
@@ -91,3 +115,134 @@ builder.set_finish_point("identity")
 builder.set_finish_point("unknown")
 
 agent_executor = builder.compile()
+
+# Response cache in front of the graph, created on the first query
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(
+        embeddings=get_embeddings(),
+        db=stores.connect(),
+        ttl=settings.RESPONSE_CACHE_TTL,
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        threshold=settings.RESPONSE_CACHE_THRESHOLD,
+        path=settings.RESPONSE_CACHE_PATH,
+    )
+
+
+# Nodes whose LLM output is user-facing and worth streaming
+STREAMING_NODES = ("faculty", "identity")
+
+
+def warm_up() -> None:
+    """
+    Open the tables queries read and load the fast-path directory, so the
+    first request does not pay for it.
+    """
+    opened = stores.warm_up([
+        settings.FACULTY_TABLE, settings.RAG_TABLE, settings.CIRCULARS_TABLE,
+        settings.CIRCULAR_CHUNKS_TABLE, settings.EMBEDDING_CACHE_TABLE,
+    ])
+    get_directory()
+    print(f"🔥 Warmed up tables: {', '.join(opened) or 'none'}")
+
+
+def _cached_state(query: str, entry) -> dict:
+    return {"query": query, "intent": entry.intent, "result": entry.response, "cached": True}
+
+
+def _fast_path_state(query: str, intent: str | None = None) -> dict | None:
+    """
+    Fast-path answer for faculty lookups, tried before the response cache:
+    it is exact and needs no embedding call, unlike a cache lookup. The
+    only place the fast path runs, so it is also tried when the local tier
+    cannot classify the query (the LLM may still call it faculty_info).
+    """
+    if (intent or classify_local(query)) not in ("faculty_info", None):
+        return None
+    with tracing.span("fast_path") as attrs:
+        answer = answer_directly(query)
+        attrs["answered"] = bool(answer)
+    return {"query": query, "intent": "faculty_info", "result": answer} if answer else None
+
+
+def _note_outcome(trace, state: dict) -> None:
+    if trace is not None:
+        trace.attrs.update(intent=state.get("intent"), cached=bool(state.get("cached")))
+
+
+async def run_query(query: str, intent: str | None = None) -> dict:
+    """
+    Answer a query through the response cache, running the graph on a miss.
+    Returns the final graph state (query, intent, result), with
+    cached=True when it was served from the cache. Traced per stage.
+    Pass an already known `intent` to skip classification.
+    """
+    with tracing.request(query) as trace:
+        result = await _run_query(query, intent)
+        _note_outcome(trace, result)
+        return result
+
+
+async def _run_query(query: str, intent: str | None = None) -> dict:
+    fast = _fast_path_state(query, intent)
+    if fast:
+        return fast
+
+    config = {"callbacks": tracing.callbacks()}
+    state = {"query": query, "intent": intent} if intent else {"query": query}
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return await agent_executor.ainvoke(state, config=config)
+
+    entry, vector = await get_response_cache().aget(query)
+    if entry:
+        return _cached_state(query, entry)
+
+    result = await agent_executor.ainvoke(state, config=config)
+    get_response_cache().put(query, result.get("intent", "unknown"), result.get("result", ""), vector)
+    return result
+
+
+async def stream_query(query: str):
+    """
+    Streaming variant of run_query. Yields {"type": "token", "text": ...}
+    events as the faculty/identity LLMs generate, then one
+    {"type": "final", "state": {...}} with the final graph state. Answers
+    that involve no streamed LLM call (fast path, circulars, cache hits)
+    arrive whole in the final state.
+    """
+    with tracing.request(query) as trace:
+        async for event in _stream_query(query):
+            if event["type"] == "final":
+                _note_outcome(trace, event["state"])
+            yield event
+
+
+async def _stream_query(query: str):
+    fast = _fast_path_state(query)
+    if fast:
+        yield {"type": "final", "state": fast}
+        return
+
+    vector = None
+    if settings.RESPONSE_CACHE_ENABLED:
+        entry, vector = await get_response_cache().aget(query)
+        if entry:
+            yield {"type": "final", "state": _cached_state(query, entry)}
+            return
+
+    final = {}
+    async for event in agent_executor.astream_events(
+            {"query": query}, config={"callbacks": tracing.callbacks()}, version="v2"
+    ):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            if event.get("metadata", {}).get("langgraph_node") in STREAMING_NODES:
+                text = event["data"]["chunk"].content
+                if isinstance(text, str) and text:
+                    yield {"type": "token", "text": text}
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            final = event["data"]["output"]
+
+    if settings.RESPONSE_CACHE_ENABLED:
+        get_response_cache().put(query, final.get("intent", "unknown"), final.get("result", ""), vector)
+    yield {"type": "final", "state": final}
@@ -0,0 +1,56 @@
+"""
+Explicit ingestion: everything that (re)builds an index lives here, so
+serving processes never embed or index at import time.
+
+    uv run ingest.py              # faculty + circulars
+    uv run ingest.py faculty      # scrape faculty, embed, publish faculty & faculty_rag
+    uv run ingest.py rag          # rebuild faculty_rag from the stored faculty vectors
+    uv run ingest.py circulars    # sync circulars and index their PDF content
+    uv run ingest.py indexes      # re-plan the ANN indexes of all vector tables
+"""
+import argparse
+import asyncio
+
+STEPS = ["faculty", "rag", "circulars", "indexes"]
+
+
+def run(step: str) -> None:
+    if step == "faculty":
+        from data_ingestion.scraper import extract_and_store_faculty_data
+
+        asyncio.run(extract_and_store_faculty_data())
+    elif step == "rag":
+        from data_ingestion.loader import build_rag_table
+
+        build_rag_table()
+    elif step == "circulars":
+        from circulars.circulars_fetcher import refresh_circulars
+
+        refresh_circulars()
+    elif step == "indexes":
+        from config import settings
+        from data_ingestion.index_manager import ensure_index
+        from stores import stores
+
+        names = [settings.RAG_TABLE, settings.CIRCULARS_TABLE, settings.CIRCULAR_CHUNKS_TABLE]
+        for name in names:
+            table = stores.table(name, latest=True)
+            if table is not None:
+                plan = ensure_index(table, metric="cosine")
+                print(f"   {name}: {plan.kind} {plan.params}")
+        stores.publish(names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("step", nargs="?", choices=STEPS + ["all"], default="all")
+    args = parser.parse_args()
+
+    # The faculty step already publishes faculty_rag
+    for step in (["faculty", "circulars"] if args.step == "all" else [args.step]):
+        print(f"📥 Ingesting: {step}")
+        run(step)
+
+
+if __name__ == "__main__":
+    main()
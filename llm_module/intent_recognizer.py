@@ -1,13 +1,11 @@
-import os
-from dotenv import load_dotenv
+from functools import lru_cache
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough, RunnableSequence
-from langchain_google_genai import ChatGoogleGenerativeAI
+from clients import get_chat_model
+import tracing
 from config import settings
-
-# Load environment variables
-load_dotenv()
+from llm_module.local_intent import classify_local
 
 # 🚀 Improved prompt with explicit identity-related intent category
 template = """
@@ -23,33 +21,86 @@ Answer with exactly one of: faculty_info, pdf_request, identity, unknown
 """
 prompt = PromptTemplate(input_variables=["text"], template=template)
 
-# Gemini-powered classifier
-llm = ChatGoogleGenerativeAI(
-    model=settings.GEMINI_CHAT_MODEL,
-    google_api_key=os.getenv("GEMINI_API_KEY"),
-    temperature=0
-)
 
-# Classifier chain
-chain = RunnableSequence(
-    first=RunnablePassthrough.assign(text=lambda x: x["text"]),
-    last=prompt | llm | StrOutputParser()
-)
+@lru_cache(maxsize=1)
+def get_chain() -> RunnableSequence:
+    """
+    Gemini-powered classifier chain, built on first use (queries the local
+    rules answer never need it).
+    """
+    return RunnableSequence(
+        first=RunnablePassthrough.assign(text=lambda x: x["text"]),
+        last=prompt | get_chat_model(temperature=0) | StrOutputParser()
+    )
+
+
+INTENTS = ["faculty_info", "pdf_request", "identity"]
+
+
+def _parse_intent(resp: str) -> str:
+    resp = resp.strip().lower()
+    return resp if resp in INTENTS else "unknown"
+
+
+def _local_intent(text: str) -> str | None:
+    return classify_local(text) if settings.LOCAL_INTENT_ENABLED else None
+
 
 def recognize_intent(text: str) -> str:
     """
     Runs the classification chain and returns one of:
-    'faculty_info', 'pdf_request', 'identity', or 'unknown'
+    'faculty_info', 'pdf_request', 'identity', or 'unknown'.
+    Confident rule-based matches skip the LLM entirely.
     """
+    local = _local_intent(text)
+    if local:
+        return local
     try:
-        resp = chain.invoke({"text": text}).strip().lower()
-        if resp in ["faculty_info", "pdf_request", "identity"]:
-            return resp
+        return _parse_intent(get_chain().invoke({"text": text}))
+    except Exception as e:
+        print(f"❌ Intent classification error: {e}")
         return "unknown"
+
+
+async def arecognize_intent(text: str) -> str:
+    """
+    Async variant of recognize_intent; awaits the LLM without blocking
+    the event loop.
+    """
+    local = _local_intent(text)
+    if local:
+        tracing.count("intent_local")
+        return local
+    tracing.count("intent_llm")
+    try:
+        return _parse_intent(await get_chain().ainvoke({"text": text}))
     except Exception as e:
         print(f"❌ Intent classification error: {e}")
         return "unknown"
 
+
+async def arecognize_intents(texts: list[str], max_concurrency: int | None = None) -> list[str]:
+    """
+    Batch variant of arecognize_intent: rule-based matches first, then a
+    single abatch over the rest with at most `max_concurrency` LLM calls
+    in flight.
+    """
+    intents = [_local_intent(t) for t in texts]
+    pending = [i for i, intent in enumerate(intents) if not intent]
+    if pending:
+        responses = await get_chain().abatch(
+            [{"text": texts[i]} for i in pending],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        for i, resp in zip(pending, responses):
+            if isinstance(resp, Exception):
+                print(f"❌ Intent classification error: {resp}")
+                intents[i] = "unknown"
+            else:
+                intents[i] = _parse_intent(resp)
+    return intents
+
 # 🔍 Example usage
 if __name__ == '__main__':
     test_queries = [
@@ -0,0 +1,59 @@
+import re
+from config import settings
+from qa_system.query_parsing import detect_departments
+
+# (intent, pattern, weight) rules distilled from the classifier prompt's categories
+RULES = [
+    ("identity", r"\bwho\s+are\s+(you|u)\b", 3.0),
+    ("identity", r"\bwhat\s+are\s+you\b", 3.0),
+    ("identity", r"\byour\s+(name|purpose|role|job|creator)\b", 3.0),
+    ("identity", r"\bwho\s+(made|created|built|developed|designed|owns)\s+you\b", 3.0),
+    ("identity", r"\bare\s+you\s+(a\s+|an\s+)?(bot|robot|human|ai|real|chatbot|person)\b", 3.0),
+    ("identity", r"\bwhat\s+(can|do)\s+you\s+do\b", 3.0),
+    ("identity", r"\b(introduce\s+yourself|about\s+yourself|novacite)\b", 3.0),
+    ("identity", r"\bhow\s+can\s+you\s+help\b", 2.0),
+
+    ("pdf_request", r"\bcirculars?\b", 3.0),
+    ("pdf_request", r"\bpdfs?\b", 3.0),
+    ("pdf_request", r"\btime\s*-?\s*tables?\b", 3.0),
+    ("pdf_request", r"\b(notices?|notifications?|announcements?)\b", 2.5),
+    ("pdf_request", r"\b(exams?|examinations?|tests?|cie)\b", 1.5),
+    ("pdf_request", r"\b(schedule|calendar|dates?|holidays?|results?|fees?)\b", 1.0),
+    ("pdf_request", r"\b(hall\s+tickets?|admit\s+cards?|make\s*-?\s*up|revaluation|syllabus)\b", 2.0),
+    ("pdf_request", r"\b(download|document)\b", 1.5),
+    ("pdf_request", r"\b(\d(st|nd|rd|th)\s+sem(ester)?|sem(ester)?)\b", 1.0),
+
+    ("faculty_info", r"\bfacult(y|ies)\b", 3.0),
+    ("faculty_info", r"\b(professors?|prof\.?|lecturers?|teachers?|staff|instructors?)\b", 2.5),
+    ("faculty_info", r"\b(hods?|heads?\s+of\s+(the\s+)?(dept|department))\b", 3.0),
+    ("faculty_info", r"\bdr\.?\s+[a-z]", 2.5),
+    ("faculty_info", r"\b(e-?mail|phone|contact|qualifications?|designation)\b", 1.5),
+    ("faculty_info", r"\b(who\s+teaches|who\s+is)\b", 1.0),
+    ("faculty_info", r"\b(department|dept)\b", 1.0),
+]
+_COMPILED = [(intent, re.compile(pattern, re.IGNORECASE), weight) for intent, pattern, weight in RULES]
+DEPARTMENT_WEIGHT = 1.0
+
+
+def score_intents(text: str) -> dict[str, float]:
+    scores = {"faculty_info": 0.0, "pdf_request": 0.0, "identity": 0.0}
+    for intent, pattern, weight in _COMPILED:
+        if pattern.search(text):
+            scores[intent] += weight
+    if detect_departments(text):
+        scores["faculty_info"] += DEPARTMENT_WEIGHT
+    return scores
+
+
+def classify_local(text: str) -> str | None:
+    """
+    Rule-based first tier. Returns an intent when the best score clears
+    LOCAL_INTENT_MIN_SCORE and beats the runner-up by LOCAL_INTENT_MARGIN,
+    else None so the caller escalates to the LLM classifier.
+    """
+    scores = score_intents(text)
+    ranked = sorted(scores.items(), key=lambda kv: -kv[1])
+    (best, top), (_, second) = ranked[0], ranked[1]
+    if top >= settings.LOCAL_INTENT_MIN_SCORE and top - second >= settings.LOCAL_INTENT_MARGIN:
+        return best
+    return None
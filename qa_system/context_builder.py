@@ -0,0 +1,120 @@
+import re
+from functools import lru_cache
+from typing import Any
+from langchain.chains import RetrievalQA
+from langchain_core.documents import Document
+from config import settings
+from qa_system.fast_path import FIELD_PATTERNS, HOD_RE
+from qa_system.query_parsing import is_listing_query
+
+# Columns in the order they appear in the context table; image URLs never do
+BASE_FIELDS = ["name", "designation", "department"]
+DETAIL_FIELDS = ["qualification", "email", "phone"]
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+    except ImportError:  # optional: `pip install tiktoken`
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # the encoding is downloaded on first use
+        print(f"⚠️ tiktoken encoding unavailable ({e}); estimating token counts.")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count of `text`: tiktoken when installed, else ~4 characters per
+    token. Either way an estimate for Gemini, good enough for budgeting.
+    """
+    encoder = _encoder()
+    if encoder is None:
+        return (len(text) + 3) // 4
+    return len(encoder.encode(text))
+
+
+def fields_for(query: str) -> list[str]:
+    """
+    Columns the question needs: the fields it asks about ("email of X"),
+    only the basics for HOD and listing questions, else every detail.
+    """
+    asked = [field for field, pattern in FIELD_PATTERNS if pattern.search(query)]
+    if asked:
+        return BASE_FIELDS + [f for f in DETAIL_FIELDS if f in asked]
+    if HOD_RE.search(query) or is_listing_query(query):
+        return list(BASE_FIELDS)
+    return BASE_FIELDS + DETAIL_FIELDS
+
+
+def _clean(value: Any) -> str:
+    return _SPACE_RE.sub(" ", str(value or "")).strip().replace("|", "/")
+
+
+def unique_people(docs: list[Document]) -> list[dict]:
+    """
+    One row per person (same name in the same department), keeping
+    retrieval order and filling empty fields from the duplicates.
+    Documents without structured metadata are kept as raw text rows.
+    """
+    people: list[dict] = []
+    seen: dict[tuple, dict] = {}
+    for doc in docs:
+        meta = doc.metadata or {}
+        name = _clean(meta.get("name"))
+        if not name:
+            people.append({"text": _clean(doc.page_content)})
+            continue
+        key = (name.lower(), _clean(meta.get("department")).lower())
+        row = seen.get(key)
+        if row is None:
+            row = seen[key] = {}
+            people.append(row)
+        for field in BASE_FIELDS + DETAIL_FIELDS:
+            row[field] = row.get(field) or _clean(meta.get(field))
+    return people
+
+
+def build_context(query: str, docs: list[Document], budget: int | None = None) -> str:
+    """
+    Retrieved faculty packed into a compact pipe-separated table with only
+    the columns `query` needs, cut to `budget` tokens (QA_CONTEXT_TOKENS).
+    """
+    budget = settings.QA_CONTEXT_TOKENS if budget is None else budget
+    people = unique_people(docs)
+    fields = [f for f in fields_for(query) if any(p.get(f) for p in people)]
+
+    lines = [" | ".join(fields)]
+    used = count_tokens(lines[0])
+    for i, person in enumerate(people):
+        line = person.get("text") or " | ".join(person.get(f) or "-" for f in fields)
+        cost = count_tokens(line) + 1
+        if used + cost > budget and len(lines) > 1:
+            lines.append(f"({len(people) - i} more matching faculty omitted)")
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines)
+
+
+class CompactRetrievalQA(RetrievalQA):
+    """
+    RetrievalQA whose "stuff" step gets a single deduplicated, budgeted
+    table (build_context) instead of every retrieved document verbatim.
+    """
+
+    token_budget: int | None = None  # None: QA_CONTEXT_TOKENS
+
+    def _compact(self, question: str, docs: list[Document]) -> list[Document]:
+        if not docs:
+            return docs
+        return [Document(page_content=build_context(question, docs, self.token_budget))]
+
+    def _get_docs(self, question: str, *, run_manager) -> list[Document]:
+        return self._compact(question, super()._get_docs(question, run_manager=run_manager))
+
+    async def _aget_docs(self, question: str, *, run_manager) -> list[Document]:
+        return self._compact(question, await super()._aget_docs(question, run_manager=run_manager))
@@ -0,0 +1,156 @@
+import re
+from config import settings
+from stores import stores
+from qa_system.query_parsing import detect_departments, is_listing_query, tokenize
+
+COLUMNS = ["name", "designation", "qualification", "email", "phone", "department"]
+
+# Field asked about -> column, checked in order
+FIELD_PATTERNS = [
+    ("email", re.compile(r"\b(e-?mail|mail\s*id|mail)\b", re.IGNORECASE)),
+    ("phone", re.compile(r"\b(phone|mobile|telephone|contact\s+(number|no))\b", re.IGNORECASE)),
+    ("qualification", re.compile(r"\b(qualifications?|degrees?|educat\w*)\b", re.IGNORECASE)),
+    ("designation", re.compile(r"\b(designation|position|post|role|title)\b", re.IGNORECASE)),
+]
+FIELD_LABELS = {
+    "email": "📧 email",
+    "phone": "📞 phone",
+    "qualification": "🎓 qualification",
+    "designation": "💼 designation",
+}
+HOD_RE = re.compile(r"\b(hods?|heads?\s+of\s+(the\s+)?(dept|department)s?)\b", re.IGNORECASE)
+HOD_DESIGNATION_RE = re.compile(r"\b(hod|head)\b", re.IGNORECASE)
+RANK_PATTERNS = [
+    re.compile(r"\bassistant\s+professors?\b", re.IGNORECASE),
+    re.compile(r"\bassociate\s+professors?\b", re.IGNORECASE),
+]
+TITLE_RE = re.compile(r"^(dr|prof|mr|mrs|ms|smt|sri|shri)\.?\s+", re.IGNORECASE)
+MAX_NAME_MATCHES = 3
+
+
+class FacultyDirectory:
+    """
+    In-memory view of the structured faculty columns for deterministic
+    answers to field lookups and listing questions.
+    """
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.name_tokens = [self._name_tokens(r["name"]) for r in rows]
+
+    @classmethod
+    def from_table(cls, table) -> "FacultyDirectory":
+        return cls(table.to_arrow().select(COLUMNS).to_pylist())
+
+    @staticmethod
+    def _name_tokens(name: str) -> set[str]:
+        name = TITLE_RE.sub("", name.strip())
+        return {t for t in tokenize(name.replace(".", " ")) if len(t) >= 3}
+
+    def match_people(self, query: str, departments: list[str]) -> list[dict]:
+        """
+        Faculty whose significant name tokens best cover the query's tokens.
+        """
+        query_tokens = set(tokenize(query))
+        best, matches = 0.0, []
+        for row, tokens in zip(self.rows, self.name_tokens):
+            if not tokens or (departments and row["department"] not in departments):
+                continue
+            score = len(tokens & query_tokens) / len(tokens)
+            if score > best:
+                best, matches = score, [row]
+            elif score == best and score > 0:
+                matches.append(row)
+        return matches if best >= 0.5 else []
+
+    def in_departments(self, departments: list[str]) -> list[dict]:
+        if not departments:
+            return list(self.rows)
+        return [r for r in self.rows if r["department"] in departments]
+
+
+def _field_asked(query: str) -> str | None:
+    for field, pattern in FIELD_PATTERNS:
+        if pattern.search(query):
+            return field
+    return None
+
+
+def _describe(row: dict) -> str:
+    return f"{row['name']} ({row['designation']}, {row['department']})"
+
+
+def _field_answer(field: str, people: list[dict]) -> str:
+    lines = []
+    for row in people:
+        value = row[field].strip()
+        if value:
+            lines.append(f"{FIELD_LABELS[field]} of {_describe(row)}: {value}")
+        else:
+            lines.append(f"I don't have a {field} on record for {_describe(row)}.")
+    return "\n".join(lines)
+
+
+def _listing_answer(title: str, rows: list[dict]) -> str:
+    lines = [f"{title} ({len(rows)}):"]
+    lines += [f"* {r['name']} — {r['designation']}, {r['department']}" for r in rows]
+    return "\n".join(lines)
+
+
+def answer_directly(query: str, directory: FacultyDirectory | None = None) -> str | None:
+    """
+    Answer field lookups ("email of X") and listing questions ("list
+    professors in Mechanical", "HOD of CSE") straight from the faculty
+    table. Returns None when the question needs the full RAG chain.
+    """
+    if not settings.FAST_PATH_ENABLED:
+        return None
+    directory = directory or get_directory()
+    if directory is None or not directory.rows:
+        return None
+
+    departments = detect_departments(query)
+    field = _field_asked(query)
+
+    if HOD_RE.search(query):
+        hods = [r for r in directory.in_departments(departments)
+                if HOD_DESIGNATION_RE.search(r["designation"])]
+        if not hods:
+            return None
+        if field:
+            return _field_answer(field, hods)
+        if len(hods) == 1 and not is_listing_query(query):
+            return f"The HOD of {hods[0]['department']} is {hods[0]['name']} ({hods[0]['designation']})."
+        return _listing_answer("Heads of Department", hods)
+
+    # A named person is never answered with a listing: field lookup, else RAG
+    people = directory.match_people(query, departments)
+    if field:
+        if 0 < len(people) <= MAX_NAME_MATCHES:
+            return _field_answer(field, people)
+        return None
+    if people:
+        return None
+
+    if is_listing_query(query) and departments:
+        rows = directory.in_departments(departments)
+        for pattern in RANK_PATTERNS:
+            if pattern.search(query):
+                rows = [r for r in rows if pattern.search(r["designation"])]
+                break
+        if rows:
+            return _listing_answer(f"Faculty in {', '.join(departments)}", rows)
+    return None
+
+
+def get_directory() -> FacultyDirectory | None:
+    """
+    The directory for the current faculty table, reloaded only when the
+    table moves to a new version.
+    """
+    if stores.table(settings.FACULTY_TABLE) is None:
+        return None
+    return stores.cached(
+        "faculty_directory", [settings.FACULTY_TABLE],
+        lambda: FacultyDirectory.from_table(stores.table(settings.FACULTY_TABLE)),
+    )
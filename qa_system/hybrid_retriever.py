@@ -0,0 +1,112 @@
+from collections import defaultdict
+from typing import Any
+from pydantic import ConfigDict, PrivateAttr
+from rank_bm25 import BM25Okapi
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+import tracing
+from config import settings
+from stores import stores
+from data_ingestion.index_manager import tune_search
+from data_ingestion.lance_tables import ID_KEY, TEXT_KEY, VECTOR_KEY, sql_in
+from qa_system.query_parsing import detect_departments, is_listing_query, tokenize
+
+
+class HybridFacultyRetriever(BaseRetriever):
+    """
+    Retriever over faculty_rag combining BM25 on name/designation/department,
+    a department prefilter parsed from the query, and vector search. The two
+    rankings are merged with reciprocal rank fusion and cut to an adaptive k:
+    small for lookups of a person, larger for listing questions.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    table: Any
+    embeddings: Embeddings
+    candidates: int = settings.HYBRID_CANDIDATES
+    rrf_k: int = settings.HYBRID_RRF_K
+    min_k: int = settings.RETRIEVER_MIN_K
+    max_k: int = settings.RETRIEVER_MAX_K
+    nprobes: int | None = None  # None: ANN_NPROBES
+    refine_factor: int | None = None  # None: ANN_REFINE_FACTOR
+    table_name: str | None = None  # set: follow the published version of this table
+    db_path: str | None = None
+
+    _rows: list[dict] = PrivateAttr(default_factory=list)
+    _positions: dict[str, int] = PrivateAttr(default_factory=dict)
+    _bm25: Any = PrivateAttr(default=None)
+    _version: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        (Re)load the lexical index from the table.
+        """
+        self._version = self.table.version
+        rows = self.table.to_arrow().select([ID_KEY, TEXT_KEY, "metadata"]).to_pylist()
+        corpus = [
+            tokenize(f"{r['metadata']['name']} {r['metadata']['designation']} "
+                     f"{r['metadata']['department']}")
+            for r in rows
+        ]
+        self._rows = rows
+        self._positions = {r[ID_KEY]: i for i, r in enumerate(rows)}
+        self._bm25 = BM25Okapi(corpus) if any(corpus) else None
+
+    def _lexical(self, query: str, departments: list[str]) -> list[int]:
+        tokens = tokenize(query)
+        if not tokens or self._bm25 is None:
+            return []
+
+        scores = self._bm25.get_scores(tokens)
+        hits = [
+            i for i, score in enumerate(scores)
+            if score > 0 and (not departments
+                              or self._rows[i]['metadata']['department'] in departments)
+        ]
+        hits.sort(key=lambda i: -scores[i])
+        return hits[:self.candidates]
+
+    def _vector(self, query: str, departments: list[str]) -> list[int]:
+        with tracing.span("embed.query"):
+            vector = self.embeddings.embed_query(query)
+        search = (self.table.search(vector,
+                                    vector_column_name=VECTOR_KEY)
+                  .metric("cosine")
+                  .select([ID_KEY])
+                  .limit(self.candidates))
+        search = tune_search(search, self.nprobes, self.refine_factor)
+        if departments:
+            search = search.where(sql_in("metadata.department", departments), prefilter=True)
+        with tracing.span("search.faculty_rag") as attrs:
+            hits = search.to_list()
+            attrs["hits"] = len(hits)
+        return [self._positions[r[ID_KEY]] for r in hits if r[ID_KEY] in self._positions]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        if self.table_name:
+            self.table = stores.table(self.table_name, self.db_path) or self.table
+        if self.table.version != self._version:
+            self.reload()  # faculty_rag was rebuilt since the index was loaded
+        departments = detect_departments(query)
+
+        fused: dict[int, float] = defaultdict(float)
+        with tracing.span("search.bm25"):
+            lexical = self._lexical(query, departments)
+        for ranking in (lexical, self._vector(query, departments)):
+            for rank, i in enumerate(ranking):
+                fused[i] += 1.0 / (self.rrf_k + rank + 1)
+
+        k = self.max_k if is_listing_query(query) else self.min_k
+        top = sorted(fused, key=lambda i: -fused[i])[:k]
+        return [
+            Document(page_content=self._rows[i][TEXT_KEY], metadata=self._rows[i]['metadata'])
+            for i in top
+        ]
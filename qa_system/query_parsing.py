@@ -0,0 +1,74 @@
+import re
+from data_ingestion.lance_tables import department_label
+
+# Ways students refer to each department, keyed by the DEPARTMENTS slug
+DEPARTMENT_ALIASES = {
+    "Civil-Engineering": [r"civil"],
+    "Mechanical-Engineering": [r"mech(anical)?"],
+    "Electrical-and-Electronics-Engineering": [r"eee", r"e\s*&\s*e", r"electrical"],
+    "Electronics-and-Communication-Engineering": [
+        r"ece", r"e\s*&\s*c", r"electronics\s+(and|&)\s+communication",
+    ],
+    "Computer-Science-and-Engineering": [r"cse", r"cs", r"computer\s+science"],
+    "Information-Science-and-Engineering": [r"ise", r"information\s+science"],
+    "Computer-Science-and-Engineering-(AI&ML)": [
+        r"ai\s*&\s*ml", r"ai\s*ml", r"aiml", r"artificial\s+intelligence",
+    ],
+    "Computer-Science-and-Business-Systems": [r"csbs", r"business\s+systems"],
+    "Physics": [r"physics"],
+    "Chemistry": [r"chemistry"],
+    "Mathematics": [r"maths?", r"mathematics"],
+}
+# A more specific match rules out the general department it contains
+_OVERRIDES = {
+    "Computer-Science-and-Engineering-(AI&ML)": "Computer-Science-and-Engineering",
+    "Computer-Science-and-Business-Systems": "Computer-Science-and-Engineering",
+}
+_PATTERNS = {
+    slug: re.compile(r"(?<![\w&])(" + "|".join(aliases) + r")(?![\w&])", re.IGNORECASE)
+    for slug, aliases in DEPARTMENT_ALIASES.items()
+}
+
+# An explicit listing verb or a plural role noun; "all"/"every" alone also
+# appear in questions about one person ("tell me all about Dr. X")
+LISTING_RE = re.compile(
+    r"\b(list|who\s+are\s+the|faculties|faculty\s+members|professors|lecturers|"
+    r"teachers|staff\s+members|hods|heads)\b",
+    re.IGNORECASE,
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "at", "for", "to", "and", "or", "is", "are",
+    "who", "what", "which", "me", "tell", "about", "give", "show", "please", "dept",
+    "department",
+}
+
+
+def detect_departments(query: str) -> list[str]:
+    """
+    Department labels (as stored in the faculty tables) mentioned in a query.
+    """
+    slugs = [slug for slug, pattern in _PATTERNS.items() if pattern.search(query)]
+    for specific, general in _OVERRIDES.items():
+        if specific in slugs and general in slugs:
+            slugs.remove(general)
+    return [department_label(slug) for slug in slugs]
+
+
+def is_listing_query(query: str) -> bool:
+    return bool(LISTING_RE.search(query))
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercase word tokens without stopwords and with a naive plural strip,
+    for lexical matching.
+    """
+    tokens = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        if tok in STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
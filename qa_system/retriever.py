@@ -1,85 +1,49 @@
-import os
 import time
-import lancedb
-from dotenv import load_dotenv
 from langchain.chains import RetrievalQA
-from langchain.schema import Document
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import LanceDB
+from clients import get_chat_model, get_embeddings
+from config import settings
+from stores import stores
+from qa_system.context_builder import CompactRetrievalQA
+from qa_system.hybrid_retriever import HybridFacultyRetriever
 
-load_dotenv()
 
-# Initialize embedding model
-embedding_model = GoogleGenerativeAIEmbeddings(
-    model="models/embedding-001",
-    google_api_key=os.getenv("GEMINI_API_KEY")
-)
+def setup_qa_chain(db_path=settings.LANCEDB_PATH, use_existing_index=True):
+    """
+    Faculty RetrievalQA chain over faculty_rag. The table is built by the
+    ingestion command (`uv run ingest.py rag`); pass use_existing_index=False
+    to rebuild it here from the stored faculty vectors.
+    """
+    # Must match the loader's model, since faculty_rag reuses its vectors
+    embedding_model = get_embeddings()
+    llm = get_chat_model(temperature=0)  # GEMINI_CHAT_MODEL
 
-# Initialize chat model
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    temperature=0,
-    google_api_key=os.getenv("GEMINI_API_KEY")
-)
-llm.name = "Smurfy"
+    if not use_existing_index:
+        from data_ingestion.loader import build_rag_table
 
-def setup_qa_chain(db_path="./lance_db", use_existing_index=True):
-    db = lancedb.connect(db_path)
-
-    if "faculty_rag" not in db.table_names() or not use_existing_index:
         print("📦 Creating faculty_rag table with index...")
+        # Reuses the vectors stored by the loader; no embedding calls here
+        build_rag_table(db_path)
 
-        if "faculty" not in db.table_names():
-            raise RuntimeError("❌ Missing 'faculty' table. Run the scraper/loader first.")
-
-        table = db.open_table("faculty")
-        records = table.to_arrow().to_pylist()
-
-        documents = []
-        for row in records:
-            content = (
-                f"{row['name']} {row['designation']} {row['qualification']} "
-                f"{row['department']} {row['email']} {row['phone']} {row['img_url']}"
-            )
-            metadata = {
-                "name": row["name"],
-                "designation": row["designation"],
-                "department": row["department"],
-                "email": row["email"],
-                "phone": row["phone"],
-                "image": row["img_url"]
-            }
-            documents.append(Document(page_content=content, metadata=metadata))
-
-        vector_store = LanceDB.from_documents(
-            documents=documents,
-            embedding=embedding_model,
-            connection=db,
-            table_name="faculty_rag"
-        )
-
-        num_vectors = len(documents)
-        if num_vectors < 256:
-            print(f"⚠️ Only {num_vectors} vectors — skipping index creation.")
-        else:
-            num_partitions = min(64, max(1, num_vectors // 2))
-            print(f"🧠 Creating PQ index with {num_partitions} partitions for {num_vectors} vectors")
-            vector_store.create_index(
-                metric="cosine",
-                vector_col="vector",
-                num_partitions=num_partitions
-            )
+    table = stores.table(settings.RAG_TABLE, db_path)
+    if table is None:
+        raise RuntimeError("❌ Missing 'faculty_rag' table. Run `uv run ingest.py` first.")
 
-        print("✅ faculty_rag table created and indexed.")
+    if settings.FACULTY_RETRIEVER == "hybrid":
+        retriever = HybridFacultyRetriever(table=table, embeddings=embedding_model,
+                                           table_name=settings.RAG_TABLE, db_path=db_path)
     else:
+        from langchain_community.vectorstores import LanceDB
+
         vector_store = LanceDB(
-            connection=db,
-            table_name="faculty_rag",
+            connection=stores.connect(db_path),
+            table_name=settings.RAG_TABLE,
             embedding=embedding_model
         )
-
-    retriever = vector_store.as_retriever(search_kwargs={"k": 50, "n_probe": 10})
-    qa = RetrievalQA.from_chain_type(
+        retriever = vector_store.as_retriever(search_kwargs={"k": 50})
+    # "compact" stuffs one deduplicated, token-budgeted table; "raw" stuffs
+    # every retrieved document as is (kept for comparison)
+    chain_cls = CompactRetrievalQA if settings.QA_CONTEXT_MODE == "compact" else RetrievalQA
+    qa = chain_cls.from_chain_type(
         llm=llm,
         retriever=retriever,
         chain_type="stuff"
@@ -0,0 +1,118 @@
+"""
+Scheduled refresh of circulars (daily) and faculty data (weekly) on an
+AsyncIOScheduler, either inside the serving process (REFRESH_IN_SERVER)
+or on its own. Runs are jittered, each job holds a file lock so only one
+instance of it runs across processes, and readers switch to the new table
+versions only once a job has published them (stores.publish).
+
+    uv run refresh_service.py                 # run the schedule until stopped
+    uv run refresh_service.py --now circulars # run one job now and exit
+    uv run refresh_service.py --now all
+"""
+import os
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Callable
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from filelock import FileLock, Timeout
+from config import settings
+
+
+def refresh_circulars() -> None:
+    from circulars.circulars_fetcher import refresh_circulars as refresh
+
+    refresh()
+
+
+def refresh_faculty() -> None:
+    from data_ingestion.scraper import extract_and_store_faculty_data
+
+    # Own event loop: the crawl never competes with requests on the serving loop
+    asyncio.run(extract_and_store_faculty_data())
+
+
+JOBS = {"circulars": refresh_circulars, "faculty": refresh_faculty}
+
+
+def job_lock(name: str) -> FileLock:
+    """
+    The cross-process lock held while job `name` runs.
+    """
+    os.makedirs(settings.REFRESH_LOCK_DIR, exist_ok=True)
+    return FileLock(os.path.join(settings.REFRESH_LOCK_DIR, f"{name}.lock"))
+
+
+async def run_job(name: str, target: Callable[[], None] | None = None) -> bool:
+    """
+    Run job `name` (or `target` under its lock) in a worker thread unless
+    another process, or another run here, holds its lock. Returns True
+    when it completed.
+    """
+    lock = job_lock(name)
+    try:
+        lock.acquire(timeout=0)
+    except Timeout:
+        print(f"⏭️ {name} refresh already running elsewhere; skipping.")
+        return False
+
+    start = time.perf_counter()
+    print(f"[{datetime.now()}] 🔄 Refreshing {name}...")
+    try:
+        await asyncio.to_thread(target or JOBS[name])
+    except Exception as e:
+        print(f"❌ {name} refresh failed: {e}")
+        return False
+    finally:
+        lock.release()
+    print(f"✅ {name} refreshed in {time.perf_counter() - start:.1f}s")
+    return True
+
+
+def create_scheduler() -> AsyncIOScheduler:
+    """
+    The refresh schedule; call .start() from a running event loop.
+    """
+    sched = AsyncIOScheduler()
+    common = {"jitter": settings.REFRESH_JITTER, "max_instances": 1, "coalesce": True}
+    sched.add_job(run_job, "cron", args=["circulars"], id="circulars",
+                  hour=settings.SCRAPE_HOUR, minute=0, **common)
+    sched.add_job(run_job, "cron", args=["faculty"], id="faculty",
+                  day_of_week=settings.FACULTY_REFRESH_DAY, hour=settings.FACULTY_REFRESH_HOUR,
+                  minute=0, **common)
+    return sched
+
+
+async def serve() -> None:
+    sched = create_scheduler()
+    sched.start()
+    print(f"⏰ Refresh service started — circulars daily at {settings.SCRAPE_HOUR}:00, "
+          f"faculty on {settings.FACULTY_REFRESH_DAY} at {settings.FACULTY_REFRESH_HOUR}:00 "
+          f"(jitter up to {settings.REFRESH_JITTER}s)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        sched.shutdown(wait=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--now", choices=list(JOBS) + ["all"], help="run a job once and exit")
+    args = parser.parse_args()
+
+    try:
+        if args.now:
+            async def once():
+                for name in (list(JOBS) if args.now == "all" else [args.now]):
+                    await run_job(name)
+
+            asyncio.run(once())
+        else:
+            asyncio.run(serve())
+    except (KeyboardInterrupt, SystemExit):
+        print("🛑 Refresh service stopped.")
+
+
+if __name__ == "__main__":
+    main()
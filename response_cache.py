@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, field
+import numpy as np
+from langchain_core.embeddings import Embeddings
+import tracing
+from config import settings
+from data_ingestion.embedding_cache import normalize_text
+from llm_module.local_intent import classify_local
+from stores import stores
+
+logger = logging.getLogger(__name__)
+
+# Tables whose contents an answer for each intent depends on
+INTENT_TABLES = {
+    "faculty_info": [settings.FACULTY_TABLE, settings.RAG_TABLE],
+    "pdf_request": [settings.CIRCULARS_TABLE],
+}
+
+
+@dataclass
+class CacheEntry:
+    query: str
+    intent: str
+    response: str
+    created: float
+    versions: dict = field(default_factory=dict)
+    vector: list | None = None
+
+
+def cache_key(query: str) -> str:
+    return normalize_text(query).lower().rstrip("?.! ")
+
+
+class ResponseCache:
+    """
+    Response cache in front of the agent graph. Lookups match the exact
+    normalized query first, then (optionally) the most similar cached query
+    of the same intent by embedding cosine similarity. Entries expire after
+    a TTL, are evicted LRU beyond max_entries, and are dropped when a table
+    their intent depends on moves to a new version.
+    """
+
+    def __init__(self, embeddings: Embeddings | None, db, ttl: int, max_entries: int,
+                 threshold: float, path: str = ""):
+        self.embeddings = embeddings
+        self.db = db
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.path = path
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+        self._versions_checked = 0.0
+        self._load()
+
+    # ── table versions ────────────────────────────────────────────────────
+    def _current_versions(self) -> dict[str, int]:
+        if time.time() - self._versions_checked >= settings.RESPONSE_CACHE_VERSION_CHECK:
+            names = set(self.db.table_names())
+            # Answers come from the published versions while a refresh is in progress
+            published = stores.published()
+            self._versions = {
+                t: published.get(t) or self.db.open_table(t).version
+                for tables in INTENT_TABLES.values() for t in tables if t in names
+            }
+            self._versions_checked = time.time()
+        return self._versions
+
+    def _versions_for(self, intent: str) -> dict[str, int]:
+        current = self._current_versions()
+        return {t: current.get(t, 0) for t in INTENT_TABLES.get(intent, [])}
+
+    def _is_valid(self, entry: CacheEntry) -> bool:
+        if time.time() - entry.created > self.ttl:
+            return False
+        return entry.versions == self._versions_for(entry.intent)
+
+    # ── lookup / insert ───────────────────────────────────────────────────
+    def _semantic_match(self, vector: list[float], intent: str) -> CacheEntry | None:
+        candidates = [e for e in self._entries.values() if e.intent == intent and e.vector]
+        if not candidates:
+            return None
+        matrix = np.asarray([e.vector for e in candidates], dtype=np.float32)
+        query = np.asarray(vector, dtype=np.float32)
+        sims = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-9)
+        best = int(np.argmax(sims))
+        return candidates[best] if sims[best] >= self.threshold else None
+
+    async def aget(self, query: str) -> tuple[CacheEntry | None, list[float] | None]:
+        """
+        Returns (entry, query_vector); the vector is handed back so a miss
+        can be stored without embedding the query twice.
+        """
+        key = cache_key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not self._is_valid(entry):
+                del self._entries[key]
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+                self.hits["exact"] += 1
+                tracing.count("response_cache_exact_hits")
+                self._log("exact hit", query)
+                return entry, entry.vector
+
+        vector = None
+        # Semantic matches must agree on intent, and only intents whose
+        # answers do not depend on entities in the query match at all;
+        # everything else is served on exact matches only.
+        intent = classify_local(query)
+        if (settings.RESPONSE_CACHE_SEMANTIC and self.embeddings
+                and intent in settings.RESPONSE_CACHE_SEMANTIC_INTENTS):
+            with tracing.span("embed.query"):
+                vector = await self.embeddings.aembed_query(query)
+            with self._lock:
+                entry = self._semantic_match(vector, intent)
+                if entry and self._is_valid(entry):
+                    self._entries.move_to_end(cache_key(entry.query))
+                    self.hits["semantic"] += 1
+                    tracing.count("response_cache_semantic_hits")
+                    self._log("semantic hit", query)
+                    return entry, vector
+
+        with self._lock:
+            self.misses += 1
+        tracing.count("response_cache_misses")
+        self._log("miss", query)
+        return None, vector
+
+    def put(self, query: str, intent: str, response: str, vector: list[float] | None = None) -> None:
+        if intent not in settings.RESPONSE_CACHE_INTENTS or not response:
+            return
+        entry = CacheEntry(
+            query=query, intent=intent, response=response, created=time.time(),
+            versions=self._versions_for(intent), vector=vector,
+        )
+        with self._lock:
+            key = cache_key(query)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def _log(self, outcome: str, query: str) -> None:
+        logger.info(
+            f"CACHE {outcome}: {query!r} | hits={self.hits['exact']}+{self.hits['semantic']} "
+            f"misses={self.misses} size={len(self._entries)}"
+        )
+
+    # ── on-disk backing ───────────────────────────────────────────────────
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for key, raw in json.load(f).items():
+                    self._entries[key] = CacheEntry(**raw)
+        except Exception as e:
+            logger.warning(f"Could not load response cache from {self.path}: {e}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({k: asdict(e) for k, e in self._entries.items()}, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save response cache to {self.path}: {e}")
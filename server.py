@@ -0,0 +1,193 @@
+# server.py
+import time
+import uuid
+import json
+import asyncio
+import logging
+from aiohttp import web
+from config import settings
+from tracing import metrics, setup_logging
+from graph import run_query, stream_query, warm_up
+from circulars.circulars_fetcher import select_circular
+from circulars.downloads import download_manager
+
+setup_logging("logs/app.log")
+logger = logging.getLogger(__name__)
+
+# ─── Shared state ──────────────────────────────────────────────────────────────
+# Caps concurrent graph runs (and so concurrent Gemini calls)
+_query_slots = asyncio.Semaphore(settings.SERVER_MAX_CONCURRENCY)
+# selection_id -> (created, candidates) for the two-step circular flow
+_pending_selections: dict[str, tuple[float, list[dict]]] = {}
+
+
+def _expire_selections() -> None:
+    cutoff = time.time() - settings.SERVER_SELECTION_TTL
+    for sid in [sid for sid, (created, _) in _pending_selections.items() if created < cutoff]:
+        del _pending_selections[sid]
+
+
+async def _json_body(request: web.Request) -> dict:
+    try:
+        body = await request.json()
+    except Exception:
+        raise web.HTTPBadRequest(text="Request body must be JSON.")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="Request body must be a JSON object.")
+    return body
+
+
+async def _limited(start):
+    """
+    Run the coroutine `start()` returns under the concurrency limit and the
+    per-request timeout (time spent waiting for a slot counts against the
+    timeout). It is only created once a slot is free, so a request that
+    times out in the queue leaves no coroutine behind.
+    """
+    async def run():
+        async with _query_slots:
+            return await start()
+
+    try:
+        return await asyncio.wait_for(run(), timeout=settings.SERVER_REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise web.HTTPGatewayTimeout(text="The request took too long; please try again.")
+
+
+async def _parse_query(request: web.Request) -> tuple[str, str]:
+    body = await _json_body(request)
+    query = str(body.get("query", "")).strip()
+    if not query:
+        raise web.HTTPBadRequest(text="Missing 'query'.")
+    return query, body.get("session_id") or uuid.uuid4().hex
+
+
+def _payload(session_id: str, query: str, result: dict) -> dict:
+    """
+    Log a finished query and build its response body, registering a
+    pending selection when circular candidates were returned.
+    """
+    intent = result.get("intent", "unknown")
+    logger.info(f"[{session_id}] USER: {query} | INTENT: {intent}")
+    logger.info(f"[{session_id}] BOT : {result.get('result', '')}")
+
+    payload = {
+        "session_id": session_id,
+        "intent": intent,
+        "result": result.get("result", "No response."),
+        "cached": bool(result.get("cached")),
+    }
+    candidates = result.get("candidates")
+    if candidates:
+        _expire_selections()
+        selection_id = uuid.uuid4().hex
+        _pending_selections[selection_id] = (time.time(), candidates)
+        payload["selection_id"] = selection_id
+        payload["candidates"] = [
+            {"id": i + 1, "title": c["title"], "url": c["url"]} for i, c in enumerate(candidates)
+        ]
+    return payload
+
+
+# ─── Handlers ──────────────────────────────────────────────────────────────────
+async def handle_query(request: web.Request) -> web.Response:
+    """
+    POST /query {"query": "...", "session_id": optional}
+    Circular requests come back with "candidates" and a "selection_id"
+    to pass to POST /circulars/select.
+    """
+    query, session_id = await _parse_query(request)
+
+    result = await _limited(lambda: run_query(query))
+    return web.json_response(_payload(session_id, query, result))
+
+
+async def handle_query_stream(request: web.Request) -> web.StreamResponse:
+    """
+    POST /query/stream — same body as /query; responds with NDJSON lines:
+    {"type": "token", "text": ...} as the LLM generates, then a final
+    {"type": "final", ...} line carrying the /query payload, or a
+    {"type": "error", ...} line if the query times out or fails.
+    """
+    query, session_id = await _parse_query(request)
+    resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await resp.prepare(request)
+
+    async def write(event: dict) -> None:
+        await resp.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    try:
+        async with asyncio.timeout(settings.SERVER_REQUEST_TIMEOUT):
+            async with _query_slots:
+                async for event in stream_query(query):
+                    if event["type"] == "token":
+                        await write(event)
+                    else:
+                        await write({"type": "final", **_payload(session_id, query, event["state"])})
+    except TimeoutError:
+        await write({"type": "error", "error": "The request took too long; please try again."})
+    except Exception:
+        # Headers are already sent: end the stream with an error line, not a cut-off
+        logger.exception(f"[{session_id}] Streaming query failed: {query}")
+        await write({"type": "error", "error": "Something went wrong; please try again."})
+    await resp.write_eof()
+    return resp
+
+
+async def handle_select(request: web.Request) -> web.Response:
+    """
+    POST /circulars/select {"selection_id": "...", "choice": 1 | "skip"}
+    """
+    body = await _json_body(request)
+    _expire_selections()
+    pending = _pending_selections.pop(str(body.get("selection_id", "")), None)
+    if pending is None:
+        raise web.HTTPNotFound(text="Unknown or expired selection_id.")
+
+    result = await _limited(lambda: select_circular(pending[1], str(body.get("choice", ""))))
+    logger.info(f"SELECT: {body.get('choice')} -> {result}")
+    return web.json_response({"result": result})
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok"})
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    """
+    GET /metrics: per-stage latency and counters in Prometheus text format.
+    """
+    return web.Response(text=metrics.render(), content_type="text/plain")
+
+
+async def _start_refresh(app: web.Application) -> None:
+    if settings.REFRESH_IN_SERVER:
+        from refresh_service import create_scheduler
+
+        app["refresh_scheduler"] = create_scheduler()
+        app["refresh_scheduler"].start()
+
+
+async def _stop_refresh(app: web.Application) -> None:
+    if "refresh_scheduler" in app:
+        app["refresh_scheduler"].shutdown(wait=False)
+
+
+def create_app() -> web.Application:
+    app = web.Application()
+    app.router.add_post("/query", handle_query)
+    app.router.add_post("/query/stream", handle_query_stream)
+    app.router.add_post("/circulars/select", handle_select)
+    app.router.add_get("/health", handle_health)
+    app.router.add_get("/metrics", handle_metrics)
+    app.on_startup.append(lambda _: asyncio.to_thread(warm_up))
+    app.on_startup.append(_start_refresh)
+    app.on_cleanup.append(_stop_refresh)
+    app.on_cleanup.append(lambda _: download_manager.close())
+    return app
+
+
+# ─── Entrypoint ────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    print(f"🌐 NovaCite server on http://{settings.SERVER_HOST}:{settings.SERVER_PORT}")
+    web.run_app(create_app(), host=settings.SERVER_HOST, port=settings.SERVER_PORT)
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import threading
+from datetime import timedelta
+from typing import Any, Callable
+from filelock import FileLock
+from config import settings
+
+# Table versions readers are pinned to, written by ingestion jobs (publish)
+PUBLISHED_FILE = "_published.json"
+
+
+class StoreRegistry:
+    """
+    Shared LanceDB handles: one connection per path, opened tables cached
+    across queries, and objects built from tables (retrievers, in-memory
+    directories) rebuilt only when one of their tables moves to a new
+    version. Connections re-check table versions at most every
+    STORE_CONSISTENCY_INTERVAL seconds, so a nightly rebuild written from
+    another process is picked up without reopening anything.
+
+    Tables listed in the path's published-versions file are read at the
+    published version, so readers move from one complete, indexed version
+    to the next and never see a rebuild in progress.
+    """
+
+    def __init__(self, consistency_interval: float):
+        self.consistency_interval = consistency_interval
+        self._lock = threading.RLock()
+        self._connections: dict[str, Any] = {}
+        self._tables: dict[tuple[str, str], Any] = {}
+        # (path, key) -> (table versions it was built from, object)
+        self._derived: dict[tuple[str, str], tuple[tuple, Any]] = {}
+        # path -> (checked at, file mtime, {table: version})
+        self._published: dict[str, tuple[float, float, dict[str, int]]] = {}
+        self._pinned: dict[tuple[str, str, int], Any] = {}
+
+    def connect(self, path: str | None = None):
+        path = path or settings.LANCEDB_PATH
+        with self._lock:
+            if path not in self._connections:
+                import lancedb  # deferred: pulls in pyarrow and the Lance runtime
+
+                self._connections[path] = lancedb.connect(
+                    path, read_consistency_interval=timedelta(seconds=self.consistency_interval)
+                )
+            return self._connections[path]
+
+    def table(self, name: str, path: str | None = None, latest: bool = False):
+        """
+        Cached handle to `name`, or None when the table does not exist yet.
+        Read at its published version if it has one; writers pass
+        latest=True for the live table.
+        """
+        path = path or settings.LANCEDB_PATH
+        version = None if latest else self.published(path).get(name)
+        with self._lock:
+            if version is not None:
+                pinned = self._pinned_table(name, path, version)
+                if pinned is not None:
+                    return pinned
+            table = self._tables.get((path, name))
+            if table is None:
+                conn = self.connect(path)
+                if name not in conn.table_names():
+                    return None
+                table = self._tables[(path, name)] = conn.open_table(name)
+            return table
+
+    def _pinned_table(self, name: str, path: str, version: int):
+        key = (path, name, version)
+        if key not in self._pinned:
+            try:
+                table = self.connect(path).open_table(name)
+                table.checkout(version)
+            except Exception as e:  # dropped, or the version was cleaned up
+                print(f"⚠️ Published version {version} of {name} unavailable ({e}); reading latest.")
+                return None
+            # Older versions of this table are no longer handed out
+            for old in [k for k in self._pinned if k[:2] == (path, name)]:
+                del self._pinned[old]
+            self._pinned[key] = table
+        return self._pinned[key]
+
+    def published(self, path: str | None = None) -> dict[str, int]:
+        """
+        Published table versions for `path` ({} when nothing was published),
+        re-read at most every STORE_CONSISTENCY_INTERVAL seconds.
+        """
+        path = path or settings.LANCEDB_PATH
+        with self._lock:
+            checked, mtime, versions = self._published.get(path, (0.0, 0.0, {}))
+            if time.time() - checked < self.consistency_interval:
+                return versions
+            file = os.path.join(path, PUBLISHED_FILE)
+            try:
+                current = os.stat(file).st_mtime
+                if current != mtime:
+                    with open(file, encoding="utf-8") as f:
+                        versions = {k: int(v) for k, v in json.load(f).items()}
+                    mtime = current
+            except FileNotFoundError:
+                versions, mtime = {}, 0.0
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not read {file}: {e}")
+            self._published[path] = (time.time(), mtime, versions)
+            return versions
+
+    def publish(self, names: list[str], path: str | None = None) -> dict[str, int]:
+        """
+        Point readers at the current versions of `names` (call once they
+        are fully written and indexed). All of them switch together: the
+        versions file is replaced atomically.
+        """
+        path = path or settings.LANCEDB_PATH
+        conn = self.connect(path)
+        existing = set(conn.table_names())
+        file = os.path.join(path, PUBLISHED_FILE)
+        # The file lock keeps jobs in other processes from losing each other's entries
+        with self._lock, FileLock(f"{file}.lock"):
+            self._published.pop(path, None)
+            versions = dict(self.published(path))
+            versions.update({n: conn.open_table(n).version for n in names if n in existing})
+            tmp = f"{file}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(versions, f, indent=2)
+            os.replace(tmp, file)
+            self._published[path] = (time.time(), os.stat(file).st_mtime, versions)
+        print(f"📢 Published {', '.join(f'{n}@v{versions[n]}' for n in names if n in versions)}")
+        return versions
+
+    def version(self, name: str, path: str | None = None) -> int:
+        table = self.table(name, path)
+        return table.version if table is not None else 0
+
+    def cached(self, key: str, tables: list[str], build: Callable[[], Any],
+               path: str | None = None) -> Any:
+        """
+        Object built by `build()`, reused until any of `tables` changes version.
+        """
+        path = path or settings.LANCEDB_PATH
+        versions = tuple(self.version(t, path) for t in tables)
+        with self._lock:
+            hit = self._derived.get((path, key))
+            if hit is not None and hit[0] == versions:
+                return hit[1]
+        obj = build()
+        with self._lock:
+            self._derived[(path, key)] = (versions, obj)
+        return obj
+
+    def invalidate(self, name: str | None = None, path: str | None = None) -> None:
+        """
+        Forget cached handles for `name` (all tables when None), e.g. after
+        a table was dropped and recreated rather than overwritten.
+        """
+        path = path or settings.LANCEDB_PATH
+        with self._lock:
+            for key in [k for k in self._tables if k[0] == path and name in (None, k[1])]:
+                del self._tables[key]
+            for key in [k for k in self._pinned if k[0] == path and name in (None, k[1])]:
+                del self._pinned[key]
+            if name is None:
+                self._derived = {k: v for k, v in self._derived.items() if k[0] != path}
+
+    def warm_up(self, tables: list[str], path: str | None = None) -> list[str]:
+        """
+        Open `tables` ahead of the first query. Returns the ones that exist.
+        """
+        return [name for name in tables if self.table(name, path) is not None]
+
+
+stores = StoreRegistry(settings.STORE_CONSISTENCY_INTERVAL)
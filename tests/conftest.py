@@ -0,0 +1,82 @@
+"""
+Shared fixtures. Tests run offline: Gemini is replaced by the
+deterministic fakes from benchmarks.fakes, and every LanceDB lives in a
+per-test temporary directory.
+"""
+import os
+import tempfile
+
+# Settings are read at import time: point every default path at a scratch
+# directory first. config validates the key, though the fakes never use it.
+SCRATCH = tempfile.mkdtemp(prefix="novacite-tests-")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.update(
+    LANCEDB_PATH=os.path.join(SCRATCH, "lance_db"),
+    PDF_STORAGE=os.path.join(SCRATCH, "pdfs"),
+    REFRESH_LOCK_DIR=os.path.join(SCRATCH, "locks"),
+    TRACE_ENABLED="false",
+)
+
+import pytest
+import tracing
+from config import settings
+from data_ingestion.lance_tables import department_label
+
+# First call wins, so server.py's own setup_logging() leaves logs/app.log alone
+tracing.setup_logging(os.path.join(SCRATCH, "app.log"))
+
+DIM = 32
+CSE = department_label("Computer-Science-and-Engineering")
+MECH = department_label("Mechanical-Engineering")
+
+# name, designation, qualification, phone, email, img_url, department
+FACULTY = [
+    ["Dr. Rajesh Kumar", "Professor & HOD", "Ph.D", "9876500001", "rajesh@mce.ac.in", "", CSE],
+    ["Dr. Anita Rao", "Assistant Professor", "M.Tech", "9876500002", "anita@mce.ac.in", "", CSE],
+    ["Mr. Suresh Gowda", "Associate Professor", "M.E", "", "suresh@mce.ac.in", "", CSE],
+    ["Dr. Kavya Shetty", "Professor & HOD", "Ph.D", "9876500004", "kavya@mce.ac.in", "", MECH],
+    ["Mr. Naveen Patil", "Assistant Professor", "M.Tech", "9876500005", "naveen@mce.ac.in", "", MECH],
+]
+
+COLUMNS = ["name", "designation", "qualification", "phone", "email", "img_url", "department"]
+
+
+@pytest.fixture
+def faculty_rows() -> list[dict]:
+    return [dict(zip(COLUMNS, row)) for row in FACULTY]
+
+
+@pytest.fixture
+def lance_path(tmp_path, monkeypatch) -> str:
+    """
+    A fresh LANCEDB_PATH for the test.
+    """
+    path = str(tmp_path / "lance_db")
+    monkeypatch.setattr(settings, "LANCEDB_PATH", path)
+    return path
+
+
+@pytest.fixture
+def fake_clients():
+    """
+    Route clients.py to the fake chat and embedding models; yields the
+    shared FakeEmbeddings.
+    """
+    import clients
+    from benchmarks import fakes
+
+    fakes.install(dim=DIM)
+    yield clients._embeddings(settings.GEMINI_EMBEDDING_MODEL)
+    clients.use_factories()
+
+
+@pytest.fixture
+def faculty_db(lance_path, fake_clients) -> str:
+    """
+    LANCEDB_PATH holding FACULTY in the faculty and faculty_rag tables,
+    written and published by the loader.
+    """
+    from data_ingestion.loader import store_in_lancedb
+
+    store_in_lancedb([list(row) for row in FACULTY], lance_path)
+    return lance_path
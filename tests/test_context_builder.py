@@ -0,0 +1,47 @@
+from langchain_core.documents import Document
+from qa_system import context_builder
+from qa_system.context_builder import build_context, count_tokens, fields_for, unique_people
+
+
+def doc(row: dict) -> Document:
+    meta = {k: row[k] for k in ("name", "designation", "qualification", "department", "email", "phone")}
+    return Document(page_content=row["name"], metadata=meta)
+
+
+def test_fields_follow_the_question():
+    assert fields_for("email of Anita Rao") == ["name", "designation", "department", "email"]
+    assert fields_for("list professors in CSE") == ["name", "designation", "department"]
+    assert fields_for("tell me about Anita Rao") == [
+        "name", "designation", "department", "qualification", "email", "phone",
+    ]
+
+
+def test_duplicates_merge_into_one_row(faculty_rows):
+    anita = faculty_rows[1]
+    partial = doc({**anita, "email": ""})
+    people = unique_people([partial, doc(anita), Document(page_content="free | text")])
+    assert len(people) == 2
+    assert people[0]["email"] == "anita@mce.ac.in"
+    assert people[1] == {"text": "free / text"}
+
+
+def test_context_is_a_compact_table(faculty_rows):
+    context = build_context("email of Anita Rao", [doc(r) for r in faculty_rows])
+    lines = context.splitlines()
+    assert lines[0] == "name | designation | department | email"
+    assert lines[2] == "Dr. Anita Rao | Assistant Professor | Computer Science and Engineering | anita@mce.ac.in"
+    assert "9876500002" not in context
+
+
+def test_budget_cuts_rows(faculty_rows):
+    docs = [doc(r) for r in faculty_rows]
+    context = build_context("list faculty", docs, budget=count_tokens("name | designation | department") + 20)
+    assert context.splitlines()[-1].endswith("more matching faculty omitted)")
+    assert len(context.splitlines()) < len(docs) + 1
+    # The first row is always kept, however small the budget
+    assert len(build_context("list faculty", docs, budget=1).splitlines()) == 3
+
+
+def test_token_estimate_without_an_encoding(monkeypatch):
+    monkeypatch.setattr(context_builder, "_encoder", lambda: None)
+    assert count_tokens("abcdefgh") == 2
@@ -0,0 +1,100 @@
+import pytest
+from config import settings
+from qa_system.fast_path import FacultyDirectory, answer_directly, get_directory
+from qa_system.query_parsing import is_listing_query
+
+
+@pytest.fixture
+def directory(faculty_rows) -> FacultyDirectory:
+    return FacultyDirectory(faculty_rows)
+
+
+def test_field_lookup_by_name(directory):
+    answer = answer_directly("What is the email of Anita Rao?", directory)
+    assert "anita@mce.ac.in" in answer
+    assert "Rajesh" not in answer
+
+    answer = answer_directly("phone number of Dr. Rajesh Kumar", directory)
+    assert "9876500001" in answer
+
+
+def test_field_lookup_without_value(directory):
+    answer = answer_directly("contact number of Suresh Gowda", directory)
+    assert answer.startswith("I don't have a phone on record for Mr. Suresh Gowda")
+
+
+def test_field_lookup_without_a_name_needs_rag(directory):
+    assert answer_directly("what is the email format for faculty", directory) is None
+
+
+@pytest.mark.parametrize("query", [
+    "Tell me all about Dr. Rajesh in CSE",
+    "What research does every professor in CSE do? Especially Anita Rao",
+    "Is Dr. Anita Rao a staff member of CSE",
+])
+def test_named_person_never_gets_a_listing(directory, query):
+    assert answer_directly(query, directory) is None
+
+
+@pytest.mark.parametrize("query", [
+    "call rajesh about the project",
+    "roll number format for CSE",
+])
+def test_phone_needs_phone_phrasing(directory, query):
+    assert answer_directly(query, directory) is None
+
+
+def test_listing_by_department(directory):
+    answer = answer_directly("list professors in CSE", directory)
+    assert answer.splitlines()[0] == "Faculty in Computer Science and Engineering (3):"
+    assert "Kavya" not in answer
+
+
+def test_listing_filters_by_rank(directory):
+    answer = answer_directly("who are the assistant professors in mechanical", directory)
+    assert "Naveen Patil" in answer
+    assert "Kavya" not in answer
+
+
+def test_listing_needs_an_explicit_listing_word():
+    assert is_listing_query("list faculty in CSE")
+    assert is_listing_query("who are the teachers in ISE")
+    assert is_listing_query("professors in civil")
+    for query in ["tell me all about Dr. Rajesh", "every professor in CSE", "is she staff"]:
+        assert not is_listing_query(query)
+
+
+def test_hod(directory):
+    assert answer_directly("Who is the HOD of CSE?", directory) == (
+        "The HOD of Computer Science and Engineering is Dr. Rajesh Kumar (Professor & HOD)."
+    )
+    answer = answer_directly("email of the HOD of mechanical", directory)
+    assert "kavya@mce.ac.in" in answer
+
+
+def test_disabled(directory, monkeypatch):
+    monkeypatch.setattr(settings, "FAST_PATH_ENABLED", False)
+    assert answer_directly("email of Anita Rao", directory) is None
+
+
+def test_directory_follows_the_faculty_table(faculty_db):
+    directory = get_directory()
+    assert len(directory.rows) == 5
+    assert get_directory() is directory
+    assert "anita@mce.ac.in" in answer_directly("email of Anita Rao")
+
+
+def test_graph_fast_path_routing(monkeypatch):
+    import graph
+
+    monkeypatch.setattr(graph, "answer_directly", lambda query: "from the directory")
+    state = graph._fast_path_state("email of Anita Rao")
+    assert state == {"query": "email of Anita Rao", "intent": "faculty_info",
+                     "result": "from the directory"}
+    # Tried when the local tier cannot tell, skipped for other intents
+    assert graph._fast_path_state("anita rao") is not None
+    assert graph._fast_path_state("exam timetable circular pdf") is None
+    assert graph._fast_path_state("email of Anita Rao", intent="pdf_request") is None
+
+    monkeypatch.setattr(graph, "answer_directly", lambda query: None)
+    assert graph._fast_path_state("email of Anita Rao") is None
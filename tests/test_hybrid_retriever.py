@@ -0,0 +1,45 @@
+import pytest
+from config import settings
+from stores import stores
+from qa_system.hybrid_retriever import HybridFacultyRetriever
+
+
+@pytest.fixture
+def retriever(faculty_db, fake_clients) -> HybridFacultyRetriever:
+    return HybridFacultyRetriever(table=stores.table(settings.RAG_TABLE, faculty_db),
+                                  embeddings=fake_clients, min_k=2, max_k=10,
+                                  table_name=settings.RAG_TABLE, db_path=faculty_db)
+
+
+def names(docs) -> list[str]:
+    return [d.metadata["name"] for d in docs]
+
+
+def test_name_lookup_ranks_the_person_first(retriever):
+    docs = retriever.invoke("email of Suresh Gowda")
+    assert names(docs)[0] == "Mr. Suresh Gowda"
+    assert len(docs) == 2  # min_k for a person lookup
+
+
+def test_listing_uses_max_k_and_department_prefilter(retriever):
+    docs = retriever.invoke("list faculty in mechanical")
+    assert sorted(names(docs)) == ["Dr. Kavya Shetty", "Mr. Naveen Patil"]
+
+
+def test_fusion_rewards_agreeing_rankings(retriever, monkeypatch):
+    monkeypatch.setattr(retriever, "_lexical", lambda q, d: [0, 1, 2])
+    monkeypatch.setattr(retriever, "_vector", lambda q, d: [2, 1, 3])
+    docs = retriever.invoke("list faculty")
+    # 1 and 2 appear in both rankings; 2 is ranked higher on average
+    assert names(docs)[:2] == [retriever._rows[2]["metadata"]["name"],
+                               retriever._rows[1]["metadata"]["name"]]
+    assert len(docs) == 4
+
+
+def test_reloads_after_a_rebuild(retriever, faculty_db):
+    stores.connect(faculty_db).open_table(settings.RAG_TABLE).delete(
+        "metadata.name = 'Mr. Suresh Gowda'")
+    stores.publish([settings.RAG_TABLE], faculty_db)
+    docs = retriever.invoke("list faculty")
+    assert "Mr. Suresh Gowda" not in names(docs)
+    assert len(retriever._rows) == 4
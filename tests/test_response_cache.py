@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from config import settings
+from response_cache import ResponseCache
+from stores import stores
+
+
+@pytest.fixture
+def cache(lance_path, fake_clients, monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_VERSION_CHECK", 0)
+    return ResponseCache(embeddings=fake_clients, db=stores.connect(lance_path), ttl=3600,
+                         max_entries=3, threshold=0.8)
+
+
+def get(cache, query):
+    return asyncio.run(cache.aget(query))[0]
+
+
+def test_exact_hit_after_miss(cache):
+    assert get(cache, "who are you") is None
+    cache.put("who are you", "identity", "I am NovaCite.")
+    entry = get(cache, "  Who are   you? ")
+    assert entry.response == "I am NovaCite."
+    assert cache.hits == {"exact": 1, "semantic": 0}
+    assert cache.misses == 1
+
+
+def test_expiry(cache, monkeypatch):
+    cache.put("who are you", "identity", "I am NovaCite.")
+    monkeypatch.setattr(cache, "ttl", 0)
+    assert get(cache, "who are you") is None
+
+
+def test_semantic_hit_for_identity(cache, fake_clients):
+    cache.put("who are you", "identity", "I am NovaCite.",
+              fake_clients.embed_query("who are you"))
+    entry = get(cache, "who are you exactly")
+    assert entry.response == "I am NovaCite."
+    assert cache.hits["semantic"] == 1
+
+
+def test_entity_questions_match_exactly_only(cache, fake_clients):
+    query = "email of Dr. Rajesh Kumar"
+    cache.put(query, "faculty_info", "rajesh@mce.ac.in", fake_clients.embed_query(query))
+    calls = fake_clients.calls
+    assert get(cache, "email of Dr. Rajesh Kumari") is None
+    assert fake_clients.calls == calls  # no embedding call for the lookup
+    assert get(cache, query).response == "rajesh@mce.ac.in"
+
+
+def test_only_cacheable_intents_are_stored(cache):
+    cache.put("exam timetable circular", "pdf_request", "candidates...")
+    cache.put("who are you", "identity", "")
+    assert get(cache, "exam timetable circular") is None
+    assert get(cache, "who are you") is None
+
+
+def test_lru_eviction(cache):
+    for i in range(4):
+        cache.put(f"question {i}", "unknown", f"answer {i}")
+    assert get(cache, "question 0") is None
+    assert get(cache, "question 3").response == "answer 3"
+
+
+def test_new_table_version_invalidates(cache, faculty_db):
+    cache.put("email of Anita Rao", "faculty_info", "anita@mce.ac.in")
+    assert get(cache, "email of Anita Rao") is not None
+
+    stores.connect(faculty_db).open_table(settings.FACULTY_TABLE).delete("name = 'Mr. Naveen Patil'")
+    stores.publish([settings.FACULTY_TABLE], faculty_db)
+    assert get(cache, "email of Anita Rao") is None
+
+
+def test_file_backing(lance_path, tmp_path):
+    path = str(tmp_path / "cache.json")
+    db = stores.connect(lance_path)
+    first = ResponseCache(None, db, ttl=3600, max_entries=10, threshold=0.9, path=path)
+    first.put("who are you", "identity", "I am NovaCite.")
+
+    second = ResponseCache(None, db, ttl=3600, max_entries=10, threshold=0.9, path=path)
+    assert get(second, "who are you").response == "I am NovaCite."
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from config import settings
+import server
+
+CANDIDATES = [
+    {"title": "6th sem exam timetable", "url": "https://example.org/a.pdf"},
+    {"title": "Holiday list", "url": "https://example.org/b.pdf"},
+]
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+
+
+def call(scenario):
+    """
+    Run `scenario(client)` against a fresh app on a local port.
+    """
+    async def run():
+        server._query_slots = asyncio.Semaphore(settings.SERVER_MAX_CONCURRENCY)
+        async with TestClient(TestServer(server.create_app())) as client:
+            return await scenario(client)
+
+    return asyncio.run(run())
+
+
+async def post(client, path: str, body) -> tuple[int, dict | str]:
+    data = body if isinstance(body, str) else json.dumps(body)
+    async with client.post(path, data=data) as resp:
+        if resp.content_type == "application/json":
+            return resp.status, await resp.json()
+        return resp.status, await resp.text()
+
+
+def test_query_fast_path(faculty_db):
+    status, body = call(lambda c: post(c, "/query", {"query": "email of Anita Rao", "session_id": "s1"}))
+    assert status == 200
+    assert body["session_id"] == "s1"
+    assert body["intent"] == "faculty_info"
+    assert "anita@mce.ac.in" in body["result"]
+    assert body["cached"] is False
+
+
+def test_query_through_the_graph(faculty_db):
+    status, body = call(lambda c: post(c, "/query", {"query": "who are you"}))
+    assert status == 200
+    assert body["intent"] == "identity"
+    assert body["result"].startswith("Answer from")
+    assert body["session_id"]
+
+
+@pytest.mark.parametrize("body", ["not json", [1, 2], {"query": "  "}])
+def test_bad_requests(body):
+    status, _ = call(lambda c: post(c, "/query", body))
+    assert status == 400
+
+
+def test_circular_selection(monkeypatch):
+    import circulars.circulars_fetcher as fetcher
+
+    async def run_query(query):
+        return {"query": query, "intent": "pdf_request", "result": "Pick one", "candidates": CANDIDATES}
+
+    async def download_pdf(url):
+        return f"/pdfs/{url.rsplit('/', 1)[-1]}"
+
+    monkeypatch.setattr(server, "run_query", run_query)
+    monkeypatch.setattr(fetcher, "download_pdf", download_pdf)
+
+    async def scenario(client):
+        _, body = await post(client, "/query", {"query": "exam timetable"})
+        assert [c["id"] for c in body["candidates"]] == [1, 2]
+        selection = {"selection_id": body["selection_id"], "choice": 2}
+        first = await post(client, "/circulars/select", selection)
+        again = await post(client, "/circulars/select", selection)
+        return first, again
+
+    (status, body), (again_status, _) = call(scenario)
+    assert status == 200
+    assert body["result"] == '✅ Downloaded "Holiday list" and saved to /pdfs/b.pdf'
+    assert again_status == 404  # a selection is used once
+
+
+def test_unknown_selection():
+    status, _ = call(lambda c: post(c, "/circulars/select", {"selection_id": "nope", "choice": 1}))
+    assert status == 404
+
+
+def test_timeout_while_queued_starts_nothing(monkeypatch):
+    started = []
+
+    async def run_query(query):
+        started.append(query)
+        return {}
+
+    monkeypatch.setattr(server, "run_query", run_query)
+    monkeypatch.setattr(settings, "SERVER_REQUEST_TIMEOUT", 0.1)
+
+    async def scenario(client):
+        server._query_slots = asyncio.Semaphore(0)  # every slot taken
+        return await post(client, "/query", {"query": "who are you"})
+
+    status, _ = call(scenario)
+    assert status == 504
+    assert started == []
+
+
+async def stream(client, query: str) -> list[dict]:
+    async with client.post("/query/stream", data=json.dumps({"query": query})) as resp:
+        assert resp.status == 200
+        return [json.loads(line) for line in (await resp.text()).splitlines()]
+
+
+def test_stream_tokens_then_final(faculty_db):
+    events = call(lambda c: stream(c, "who are you"))
+    assert {e["type"] for e in events[:-1]} == {"token"}
+    assert events[-1]["type"] == "final"
+    assert events[-1]["intent"] == "identity"
+    assert "".join(e["text"] for e in events[:-1]).strip() == events[-1]["result"].strip()
+
+
+def test_stream_failure_ends_with_an_error_line(monkeypatch):
+    async def stream_query(query):
+        yield {"type": "token", "text": "Partial "}
+        raise RuntimeError("model went away")
+
+    monkeypatch.setattr(server, "stream_query", stream_query)
+    events = call(lambda c: stream(c, "who are you"))
+    assert [e["type"] for e in events] == ["token", "error"]
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import pytest
+from stores import PUBLISHED_FILE, StoreRegistry
+
+
+@pytest.fixture
+def registry() -> StoreRegistry:
+    # No consistency delay, so every read sees the latest writes
+    return StoreRegistry(consistency_interval=0)
+
+
+def rows(*ids: int) -> list[dict]:
+    return [{"id": i, "text": f"row {i}"} for i in ids]
+
+
+def test_missing_table(registry, tmp_path):
+    assert registry.table("nope", str(tmp_path)) is None
+    assert registry.published(str(tmp_path)) == {}
+
+
+def test_reads_stay_on_the_published_version(registry, tmp_path):
+    path = str(tmp_path)
+    table = registry.connect(path).create_table("t", data=rows(1, 2))
+    registry.publish(["t"], path)
+
+    table.add(rows(3))  # a refresh in progress
+    assert registry.table("t", path).count_rows() == 2
+    assert registry.table("t", path, latest=True).count_rows() == 3
+
+    registry.publish(["t"], path)
+    assert registry.table("t", path).count_rows() == 3
+
+
+def test_publish_switches_tables_together(registry, tmp_path):
+    path = str(tmp_path)
+    conn = registry.connect(path)
+    conn.create_table("a", data=rows(1))
+    conn.create_table("b", data=rows(1))
+    registry.publish(["a"], path)
+    versions = registry.publish(["b", "missing"], path)
+
+    assert set(versions) == {"a", "b"}
+    with open(os.path.join(path, PUBLISHED_FILE), encoding="utf-8") as f:
+        assert json.load(f) == versions
+
+
+def test_unpublished_tables_read_latest(registry, tmp_path):
+    path = str(tmp_path)
+    table = registry.connect(path).create_table("t", data=rows(1))
+    table.add(rows(2))
+    assert registry.table("t", path).count_rows() == 2
+
+
+def test_cached_rebuilds_on_new_version(registry, tmp_path):
+    path = str(tmp_path)
+    table = registry.connect(path).create_table("t", data=rows(1))
+    builds = []
+
+    def build():
+        builds.append(1)
+        return object()
+
+    first = registry.cached("obj", ["t"], build, path)
+    assert registry.cached("obj", ["t"], build, path) is first
+    table.add(rows(2))
+    assert registry.cached("obj", ["t"], build, path) is not first
+    assert len(builds) == 2
+
+
+def test_refresh_job_runs_once_across_holders(monkeypatch):
+    import refresh_service
+
+    ran = []
+    monkeypatch.setitem(refresh_service.JOBS, "test", lambda: ran.append(1))
+    with refresh_service.job_lock("test"):
+        assert asyncio.run(refresh_service.run_job("test")) is False
+    assert ran == []
+    assert asyncio.run(refresh_service.run_job("test")) is True
+    assert ran == [1]
@@ -0,0 +1,343 @@
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import functools
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+from langchain_core.callbacks import BaseCallbackHandler
+from config import settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)-8s %(message)s"
+LOG_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+trace_logger = logging.getLogger("novacite.trace")
+trace_logger.propagate = False
+_listeners: list[QueueListener] = []
+
+
+# ─── Non-blocking log handlers ────────────────────────────────────────────────
+def _queued(logger: logging.Logger, handler: logging.Handler) -> None:
+    """
+    Attach `handler` to `logger` behind a queue: callers only enqueue the
+    record, and a listener thread does the file I/O.
+    """
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(q))
+    listener = QueueListener(q, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+
+def setup_logging(path: str = "logs/app.log") -> None:
+    """
+    Conversation log (`path`) and, when TRACE_ENABLED, the JSON-lines
+    trace log (TRACE_PATH), both written off the event loop.
+    """
+    if _listeners:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    file_handler = logging.FileHandler(path, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATEFMT))
+    _queued(root, file_handler)
+
+    if settings.TRACE_ENABLED:
+        os.makedirs(os.path.dirname(settings.TRACE_PATH) or ".", exist_ok=True)
+        trace_handler = logging.FileHandler(settings.TRACE_PATH, encoding="utf-8")
+        trace_handler.setFormatter(logging.Formatter("%(message)s"))
+        trace_logger.setLevel(logging.INFO)
+        _queued(trace_logger, trace_handler)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the listener threads.
+    """
+    while _listeners:
+        _listeners.pop().stop()
+
+
+# ─── Process-wide metrics (Prometheus text format) ────────────────────────────
+class Metrics:
+    """
+    Counters and per-stage latency summaries (count and sum) aggregated
+    over every traced request, rendered for a /metrics scrape.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[str, float] = defaultdict(float)
+        self.stage_count: dict[str, int] = defaultdict(int)
+        self.stage_seconds: dict[str, float] = defaultdict(float)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_count[stage] += 1
+            self.stage_seconds[stage] += seconds
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def render(self) -> str:
+        with self._lock:
+            lines = ["# TYPE novacite_stage_seconds summary"]
+            for stage in sorted(self.stage_count):
+                lines.append(f'novacite_stage_seconds_count{{stage="{stage}"}} {self.stage_count[stage]}')
+                lines.append(f'novacite_stage_seconds_sum{{stage="{stage}"}} {self.stage_seconds[stage]:.6f}')
+            for name in sorted(self.counters):
+                lines.append(f"# TYPE novacite_{name}_total counter")
+                lines.append(f"novacite_{name}_total {self.counters[name]:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+# ─── Per-request traces ───────────────────────────────────────────────────────
+class Trace:
+    """
+    Stages (wall time plus attributes) and counters recorded while one
+    request is answered; emitted as a single JSON line when it finishes.
+    """
+
+    def __init__(self, query: str, request_id: str | None = None):
+        self.request_id = request_id or uuid.uuid4().hex[:12]
+        self.query = query
+        self.started = time.perf_counter()
+        self.stages: list[dict] = []
+        self.counters: dict[str, float] = defaultdict(float)
+        self.attrs: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, seconds: float, **attrs) -> None:
+        with self._lock:
+            self.stages.append({
+                "stage": name,
+                "start_ms": round((time.perf_counter() - seconds - self.started) * 1000, 2),
+                "ms": round(seconds * 1000, 2),
+                **attrs,
+            })
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def to_dict(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "query": self.query,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            **self.attrs,
+            "counters": dict(self.counters),
+            "stages": self.stages,
+        }
+
+
+_current: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("novacite_trace", default=None)
+
+
+def current_trace() -> Trace | None:
+    return _current.get()
+
+
+@contextmanager
+def request(query: str, request_id: str | None = None):
+    """
+    Trace everything done for one request (including work in
+    asyncio.to_thread, which copies the context) and emit it at the end.
+    """
+    if not settings.TRACE_ENABLED:
+        yield None
+        return
+    trace = Trace(query, request_id)
+    token = _current.set(trace)
+    try:
+        with _profiled(trace.request_id):
+            yield trace
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:  # finished in another context (async generator)
+            _current.set(None)
+        metrics.observe("request", time.perf_counter() - trace.started)
+        trace_logger.info(json.dumps(trace.to_dict(), ensure_ascii=False, default=str))
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a stage of the current request; a no-op outside of one. Yields a
+    dict the caller can add attributes to (doc counts, sizes).
+    """
+    trace = _current.get()
+    if trace is None:
+        yield attrs
+        return
+    start = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        if error:
+            attrs["error"] = error
+        trace.add_stage(name, seconds, **attrs)
+        metrics.observe(name, seconds)
+
+
+def count(name: str, value: float = 1) -> None:
+    """
+    Add to a counter of the current request and to the process metrics.
+    """
+    trace = _current.get()
+    if trace is not None:
+        trace.count(name, value)
+        metrics.inc(name, value)
+
+
+def traced_node(name: str):
+    """
+    Decorator timing an async LangGraph node as stage `node.<name>`. Keeps
+    the wrapped signature, so RunnableLambda still passes `config`.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(f"node.{name}"):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class TraceCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callbacks feeding the current trace: LLM wall time and
+    prompt/completion tokens per graph node, and retrieved document counts.
+    """
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self._starts: dict[Any, tuple[float, str]] = {}
+
+    def _begin(self, run_id, metadata: dict | None) -> None:
+        node = (metadata or {}).get("langgraph_node", "")
+        self._starts[run_id] = (time.perf_counter(), node)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._begin(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._begin(run_id, metadata)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        start, node = self._starts.pop(run_id, (time.perf_counter(), ""))
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for gen in generations:
+                usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+        if not (prompt_tokens or completion_tokens):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+
+        seconds = time.perf_counter() - start
+        self.trace.add_stage(f"llm.{node or 'other'}", seconds,
+                             prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        metrics.observe(f"llm.{node or 'other'}", seconds)
+        for name, value in (("prompt_tokens", prompt_tokens), ("completion_tokens", completion_tokens)):
+            self.trace.count(name, value)
+            metrics.inc(name, value)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._starts.pop(run_id, None)
+
+    def on_retriever_start(self, serialized, query, *, run_id, metadata=None, **kwargs):
+        self._begin(run_id, metadata)
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        start, _ = self._starts.pop(run_id, (time.perf_counter(), ""))
+        seconds = time.perf_counter() - start
+        self.trace.add_stage("retriever", seconds, documents=len(documents))
+        metrics.observe("retriever", seconds)
+        self.trace.count("documents_retrieved", len(documents))
+        metrics.inc("documents_retrieved", len(documents))
+
+
+def callbacks() -> list[BaseCallbackHandler]:
+    """
+    Callbacks to pass in the graph's config for the current request.
+    """
+    trace = _current.get()
+    return [TraceCallbackHandler(trace)] if trace is not None else []
+
+
+# ─── Optional profiling ───────────────────────────────────────────────────────
+# Only one profiler can be active at a time; overlapping requests go unprofiled
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def _profiled(request_id: str):
+    """
+    Profile the request with cProfile or pyinstrument (TRACE_PROFILE) into
+    TRACE_PROFILE_DIR. cProfile sees the whole thread, so concurrent
+    requests show up in each other's profiles; pyinstrument's async mode
+    follows only this request's tasks.
+    """
+    if not settings.TRACE_PROFILE or not _profile_lock.acquire(blocking=False):
+        yield
+        return
+    try:
+        with _run_profiler(settings.TRACE_PROFILE, request_id):
+            yield
+    finally:
+        _profile_lock.release()
+
+
+@contextmanager
+def _run_profiler(mode: str, request_id: str):
+    os.makedirs(settings.TRACE_PROFILE_DIR, exist_ok=True)
+    base = os.path.join(settings.TRACE_PROFILE_DIR, request_id)
+
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:  # optional: `pip install pyinstrument`
+            logging.getLogger(__name__).warning("pyinstrument is not installed; profiling skipped")
+            yield
+            return
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(f"{base}.html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{base}.prof")